@@ -0,0 +1,173 @@
+"""Benchmarks for the hot paths of ssf_mission_tools.
+
+Times CLI startup against its budget, and parse, lazy (a lazy parse that
+reads `date`), sort (`sort_and_write`), encode, unzip and a full init
+against tests/test_data/mission_01 and synthetic missions of increasing
+size, and writes the results as JSON.
+
+    python benchmarks/run_benchmarks.py --groups 100,1000,4000 --images 20 -o bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import write_miz  # noqa: E402
+
+from ssf_mission_tools.common import copy_kneeboard, copy_resources  # noqa: E402
+from ssf_mission_tools.config import Config  # noqa: E402
+from ssf_mission_tools.init import Init  # noqa: E402
+from ssf_mission_tools.parse_lua import parse_lua_table_file, sort_and_write, sort_table, write_lua_table  # noqa: E402
+from ssf_mission_tools.utils import unzip  # noqa: E402
+
+MISSION_01 = Path(__file__).resolve().parents[1] / "tests" / "test_data" / "mission_01"
+
+# startup budget of the CLI in milliseconds; editor integrations call it often
+STARTUP_BUDGET_MS = {"--version": 100, "--help": 150}
+
+
+def _time(fn: Callable[..., Any], repeat: int, setup: Callable[[], Any] | None = None) -> list[float]:
+    """Time `repeat` calls of `fn()`, or of `fn(setup())` with a fresh, untimed `setup()` per call."""
+    runs = []
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        fn(*args)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def _mission_01_miz(path: Path) -> Path:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.write(MISSION_01, "mission")
+        z.writestr("theatre", "Caucasus")
+    return path
+
+
+def bench_dataset(name: str, miz: Path, workroot: Path, repeat: int, jobs: int, scale: dict) -> list[dict]:
+    results = []
+
+    def record(benchmark: str, runs: list[float], size: int) -> None:
+        best = min(runs)
+        results.append({
+            "benchmark": benchmark,
+            "dataset": name,
+            **scale,
+            "bytes": size,
+            "seconds": best,
+            "runs": runs,
+            "mb_per_s": size / best / 1e6 if best else None,
+        })
+        print(f"{name:>20} {benchmark:>8} {best * 1000:10.1f} ms", file=sys.stderr)
+
+    extracted = workroot / f"{name}-extracted"
+    unzip(miz, extracted)
+    mission = extracted / "mission"
+    mission_size = mission.stat().st_size
+    record("parse", _time(lambda: parse_lua_table_file(mission), repeat), mission_size)
+    record("lazy", _time(lambda: parse_lua_table_file(mission, lazy=True)["data"]["date"], repeat), mission_size)
+    out = workroot / f"{name}-sorted"
+    # sorting is in place, every run gets a freshly parsed, unsorted tree
+    record("sort", _time(lambda parsed: sort_and_write(parsed["variable"], parsed["data"], out), repeat,
+                         setup=lambda: parse_lua_table_file(mission)), mission_size)
+    parsed = parse_lua_table_file(mission)
+    sort_table(parsed["data"])
+    record("encode", _time(lambda: write_lua_table(io.StringIO(), parsed["variable"], parsed["data"]), repeat), mission_size)
+    record("unzip", _time(lambda: unzip(miz, workroot / f"{name}-unzip"), repeat), miz.stat().st_size)
+
+    cfg = Config(mission_dir=miz.parent.as_posix())
+
+    def full_init(workdir: str) -> None:
+        init = Init(cfg, None, jobs)
+        init.create_directory_structure(workdir)
+        init.unpack_mission_files(miz.name, workdir)
+        init.copy_theater(workdir)
+        copy_resources(workdir)
+        copy_kneeboard(workdir)
+        errors = init.sort_and_copy_special_files(workdir)
+        if errors:
+            raise RuntimeError(errors)
+
+    # a new directory per run, so no run is a re-sync of the previous one
+    record("init", _time(full_init, repeat, setup=lambda: tempfile.mkdtemp(prefix=f"{name}-init-", dir=workroot)),
+           miz.stat().st_size)
+    return results
+
+
+def bench_startup(repeat: int) -> list[dict]:
+    import subprocess
+    results = []
+    for option, budget in STARTUP_BUDGET_MS.items():
+        cmd = [sys.executable, "-m", "ssf_mission_tools", option]
+        runs = _time(lambda: subprocess.run(cmd, capture_output=True, check=False), max(repeat, 5))
+        best = min(runs)
+        results.append({
+            "benchmark": "startup",
+            "dataset": option,
+            "seconds": best,
+            "runs": runs,
+            "budget_ms": budget,
+            "within_budget": best * 1000 <= budget,
+        })
+        print(f"{option:>20} {'startup':>8} {best * 1000:10.1f} ms (budget {budget} ms)", file=sys.stderr)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=str, default="100,1000,4000", help="Comma separated group counts of the synthetic missions")
+    parser.add_argument("--units", type=int, default=4, help="Units per synthetic group")
+    parser.add_argument("--triggers", type=int, default=200, help="Triggers per synthetic mission")
+    parser.add_argument("--images", type=int, default=10, help="Kneeboard images per synthetic .miz")
+    parser.add_argument("--image-size", type=int, default=256 * 1024, help="Size of each kneeboard image in bytes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark, the fastest run is reported")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for the init benchmark")
+    parser.add_argument("--no-mission-01", action="store_true", help="Skip the tests/test_data/mission_01 dataset")
+    parser.add_argument("-o", "--output", type=str, help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = bench_startup(args.repeat)
+    with tempfile.TemporaryDirectory(prefix="ssf-bench-") as tmp:
+        root = Path(tmp)
+        missions = root / "missions"
+        missions.mkdir()
+        if not args.no_mission_01:
+            miz = _mission_01_miz(missions / "mission_01.miz")
+            results += bench_dataset("mission_01", miz, root, args.repeat, args.jobs, {})
+        for groups in (int(g) for g in args.groups.split(",") if g):
+            miz = write_miz(missions / f"synthetic_{groups}.miz", groups, args.images, args.image_size,
+                            args.units, args.triggers)
+            scale = {"groups": groups, "units": groups * args.units, "triggers": args.triggers, "images": args.images}
+            results += bench_dataset(f"synthetic-{groups}", miz, root, args.repeat, args.jobs, scale)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
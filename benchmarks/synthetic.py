@@ -0,0 +1,144 @@
+"""Synthetic DCS missions for benchmarking.
+
+Builds mission tables shaped like the ones the DCS editor saves, scaled to a
+number of groups, units per group and triggers, and packs them into .miz
+archives with a number of kneeboard images.
+"""
+from __future__ import annotations
+
+import io
+import random
+import zipfile
+from pathlib import Path
+from typing import Any
+
+from ssf_mission_tools.parse_lua import write_lua_table
+
+_CATEGORIES = ("plane", "helicopter", "vehicle", "ship")
+_TYPES = {
+    "plane": ("F-16C_50", "FA-18C_hornet", "Su-27", "MiG-29S"),
+    "helicopter": ("UH-1H", "Mi-8MT", "AH-64D_BLK_II"),
+    "vehicle": ("M-1 Abrams", "T-72B", "BTR-80", "Ural-375"),
+    "ship": ("CVN_71", "PERRY", "MOSCOW"),
+}
+_COUNTRIES = {"blue": ((2, "USA"), (4, "UK")), "red": ((0, "Russia"), (43, "Iran"))}
+
+
+def _unit(rng: random.Random, unit_id: int, category: str, x: float, y: float) -> dict:
+    return {
+        "unitId": unit_id,
+        "name": f"Unit #{unit_id}",
+        "type": rng.choice(_TYPES[category]),
+        "skill": rng.choice(("Average", "Good", "High", "Excellent", "Client")),
+        "x": x + rng.uniform(-500, 500),
+        "y": y + rng.uniform(-500, 500),
+        "heading": rng.uniform(0, 6.283185307),
+        "livery_id": "default",
+        "payload": {"fuel": rng.randint(1000, 5000), "flare": 30, "chaff": 60, "gun": 100, "pylons": {}},
+    }
+
+
+def _group(rng: random.Random, group_id: int, first_unit_id: int, units: int, category: str) -> dict:
+    x, y = rng.uniform(-300000, 300000), rng.uniform(-700000, 700000)
+    points = {
+        i: {
+            "x": x + 10000 * i,
+            "y": y - 5000 * i,
+            "alt": rng.randint(0, 9000),
+            "speed": rng.uniform(50, 250),
+            "type": "Turning Point",
+            "action": "Turning Point",
+            "task": {"id": "ComboTask", "params": {"tasks": {}}},
+        }
+        for i in range(1, 4)
+    }
+    return {
+        "groupId": group_id,
+        "name": f"Group #{group_id}",
+        "task": "CAP" if category == "plane" else "Ground Nothing",
+        "hidden": False,
+        "start_time": 0,
+        "x": x,
+        "y": y,
+        "route": {"points": points},
+        "units": {i + 1: _unit(rng, first_unit_id + i, category, x, y) for i in range(units)},
+    }
+
+
+def generate_mission(groups: int, units_per_group: int = 4, triggers: int = 50, seed: int = 0) -> dict[str, Any]:
+    """Return a mission table with `groups` groups spread over both coalitions."""
+    rng = random.Random(seed)
+    coalitions: dict[str, Any] = {}
+    for side, countries in _COUNTRIES.items():
+        coalitions[side] = {
+            "name": side,
+            "bullseye": {"x": rng.uniform(-1e5, 1e5), "y": rng.uniform(-5e5, 5e5)},
+            "country": {
+                i + 1: {"id": cid, "name": name, **{c: {"group": {}} for c in _CATEGORIES}}
+                for i, (cid, name) in enumerate(countries)
+            },
+        }
+    slots = [(side, idx, c) for side, countries in _COUNTRIES.items()
+             for idx in range(1, len(countries) + 1) for c in _CATEGORIES]
+    unit_id = 1
+    for group_id in range(1, groups + 1):
+        side, idx, category = slots[(group_id - 1) % len(slots)]
+        group_table = coalitions[side]["country"][idx][category]["group"]
+        group_table[len(group_table) + 1] = _group(rng, group_id, unit_id, units_per_group, category)
+        unit_id += units_per_group
+
+    trig = {
+        "actions": {i: f'a_do_script("trigger_{i}()"); a_set_flag("flag_{i}", 1);' for i in range(1, triggers + 1)},
+        "conditions": {i: f'return(c_flag_is_true("flag_{i - 1}") )' for i in range(1, triggers + 1)},
+        "flag": {i: True for i in range(1, triggers + 1)},
+        "func": {},
+        "funcStartup": {},
+    }
+    trigrules = {
+        i: {
+            "comment": f"DictKey_Trigger_{i}",
+            "predicate": "triggerOnce",
+            "actions": {1: {"predicate": "a_do_script", "text": f"trigger_{i}()"}},
+            "rules": {1: {"predicate": "c_flag_is_true", "flag": f"flag_{i - 1}"}},
+        }
+        for i in range(1, triggers + 1)
+    }
+    return {
+        "coalition": coalitions,
+        "date": {"Day": 4, "Year": 1999, "Month": 1},
+        "descriptionText": "DictKey_descriptionText_1",
+        "maxDictId": triggers + 1,
+        "start_time": 34200,
+        "theatre": "Caucasus",
+        "trig": trig,
+        "trigrules": trigrules,
+        "weather": {"atmosphere_type": 0, "clouds": {"density": 0, "base": 300}, "wind": {"atGround": {"speed": 0, "dir": 0}}},
+        "version": 21,
+    }
+
+
+def lua_text(variable: str, data: Any) -> str:
+    buf = io.StringIO()
+    write_lua_table(buf, variable, data)
+    return buf.getvalue()
+
+
+def write_miz(path: str | Path, groups: int, images: int = 0, image_size: int = 256 * 1024,
+              units_per_group: int = 4, triggers: int = 50, seed: int = 0) -> Path:
+    """Write a .miz with a synthetic mission and `images` random kneeboard images."""
+    rng = random.Random(seed)
+    mission = generate_mission(groups, units_per_group, triggers, seed)
+    dictionary = {f"DictKey_Trigger_{i}": f"Trigger {i}" for i in range(1, triggers + 1)}
+    dictionary["DictKey_descriptionText_1"] = "Synthetic benchmark mission"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("mission", lua_text("mission", mission))
+        z.writestr("options", lua_text("options", {"difficulty": {"labels": 0}, "graphics": {"visibRange": "High"}}))
+        z.writestr("warehouses", lua_text("warehouses", {"airports": {}, "warehouses": {}}))
+        z.writestr("theatre", "Caucasus")
+        z.writestr("I10n/Default/dictionary", lua_text("dictionary", dictionary))
+        z.writestr("I10n/Default/mapResource", lua_text("mapResource", {}))
+        for i in range(images):
+            z.writestr(f"kneeboard/IMAGES/image_{i:03d}.png", rng.randbytes(image_size), zipfile.ZIP_STORED)
+    return path
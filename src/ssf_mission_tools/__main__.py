@@ -1,4 +1,9 @@
 from .cli import main
 
 if __name__ == "__main__":
+    # required for the process pool in frozen (PyInstaller) executables
+    import sys
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""Run `init` or `update` for many missions at once.
+
+Each mission is processed by its own task in a process pool. Workers are
+replaced after every mission, so the memory of a worker is bounded by the
+largest single mission instead of growing over the batch. The output of
+each mission is captured and reported together at the end.
+"""
+from __future__ import annotations
+
+import os
+from argparse import Namespace
+from dataclasses import dataclass
+from typing import Any
+
+from ssf_mission_tools.config import Config
+
+_GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class BatchResult:
+    mission: str | None
+    directory: str
+    rc: int
+    seconds: float
+    output: str
+
+
+def is_pattern(value: str) -> bool:
+    return not _GLOB_CHARS.isdisjoint(value)
+
+
+def expand_missions(values: list[str], mission_dir: str, directory: str) -> list[tuple[str, str]]:
+    """Map the missions given to `init` to their development directories.
+
+    A value is a mission file name, a glob pattern matched in `mission_dir`
+    or `MISSION=DIRECTORY`. A single mission is initialized in `directory`,
+    several missions in `directory/<mission name>`.
+    """
+    import fnmatch
+    explicit, names = [], []
+    for value in values:
+        if "=" in value:
+            mission, target = value.split("=", 1)
+            explicit.append((mission, target))
+        elif is_pattern(value):
+            try:
+                available = sorted(f for f in os.listdir(mission_dir) if f.endswith(".miz"))
+            except OSError:
+                available = []
+            names.extend(f for f in available if fnmatch.fnmatch(f, value) and f not in names)
+        elif value not in names:
+            names.append(value)
+    if len(names) == 1 and not explicit and not any(is_pattern(v) for v in values):
+        return [(names[0], directory)]
+    return explicit + [(name, os.path.join(directory, os.path.splitext(name)[0])) for name in names]
+
+
+def expand_directories(values: list[str]) -> list[str]:
+    """Expand the development directories given to `update`, glob patterns included."""
+    import glob
+    directories: list[str] = []
+    for value in values:
+        matches = sorted(d for d in glob.glob(value) if os.path.isdir(d)) if is_pattern(value) else [value]
+        directories.extend(d for d in matches if d not in directories)
+    return directories
+
+
+def _run_one(command: type, args: Namespace, cfg: Config) -> BatchResult:
+    # module level so it can run in a worker process
+    import contextlib
+    import io
+    import time
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        try:
+            rc = command.handle_arguments(args, cfg) or 0
+        except Exception as e:
+            print(f"{type(e).__name__}: {e}")
+            rc = -1
+    return BatchResult(args.mission, args.directory, rc, time.perf_counter() - start, out.getvalue())
+
+
+def _pool(workers: int) -> Any:
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        # a fresh worker per mission returns its memory after each mission
+        return ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1)
+    except TypeError:
+        # Python < 3.11
+        return ProcessPoolExecutor(max_workers=workers)
+
+
+def run_batch(command: type, runs: list[Namespace], cfg: Config, jobs: int = 0) -> list[BatchResult]:
+    """Run `command` for each of `runs` with `jobs` worker processes (0: one per CPU core)."""
+    workers = min(jobs or os.cpu_count() or 1, len(runs))
+    results: list[BatchResult] = []
+    if workers > 1:
+        from concurrent.futures import as_completed
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            with _pool(workers) as pool:
+                futures = [pool.submit(_run_one, command, args, cfg) for args in runs]
+                for future in as_completed(futures):
+                    result = future.result()
+                    print(f"{'done' if result.rc == 0 else 'FAILED'}: {result.mission or result.directory}")
+                    results.append(result)
+            return sorted(results, key=lambda r: r.directory)
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Could not use a process pool ({e}), processing missions serially")
+            results.clear()
+    for args in runs:
+        result = _run_one(command, args, cfg)
+        print(f"{'done' if result.rc == 0 else 'FAILED'}: {result.mission or result.directory}")
+        results.append(result)
+    return sorted(results, key=lambda r: r.directory)
+
+
+def format_report(results: list[BatchResult], seconds: float) -> str:
+    lines = ["", "Batch results:"]
+    for r in results:
+        status = "ok" if r.rc == 0 else "FAILED"
+        name = f"{r.mission} -> {r.directory}" if r.mission else r.directory
+        lines.append(f"  {status:<6} {r.seconds:7.2f}s  {name}")
+        if r.rc != 0:
+            lines.extend(f"      {line}" for line in r.output.strip().splitlines())
+    failed = sum(1 for r in results if r.rc != 0)
+    lines.append(f"{len(results)} mission(s): {len(results) - failed} succeeded, {failed} failed in {seconds:.2f}s")
+    return "\n".join(lines)
+
+
+def run_batch_command(command: type, runs: list[Namespace], cfg: Config, jobs: int) -> int:
+    """Run a batch, print the aggregated report and return -1 if any mission failed."""
+    import time
+    start = time.perf_counter()
+    print(f"Processing {len(runs)} missions...")
+    results = run_batch(command, runs, cfg, jobs)
+    print(format_report(results, time.perf_counter() - start))
+    return -1 if any(r.rc != 0 for r in results) else 0
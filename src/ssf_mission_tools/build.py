@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from typing import TYPE_CHECKING, Any
+
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.manifest import SyncManifest
+from ssf_mission_tools.shards import SHARDS_SUFFIX, assemble_shards
+from ssf_mission_tools.timings import phase
+from ssf_mission_tools.utils import RawZipMember, read_raw_member, write_raw_zip
+
+if TYPE_CHECKING:
+    from ssf_mission_tools.minify import ScriptMinifier
+
+# placeholder files created by init to let git track empty folders
+_PLACEHOLDERS = {"place_images_here"}
+
+# member holding the scripts of a release build with --bundle, and the
+# file listing the scripts in the order they are bundled
+BUNDLE_MEMBER = "I10n/Default/bundle.lua"
+BUNDLE_ORDER_FILE = "bundle.txt"
+# bump whenever the layout written by minify.bundle_lua changes, so bundles
+# of earlier builds are not reused
+_BUNDLE_VERSION = "ssf-bundle-2"
+
+
+def _file_sha256(path: str) -> str:
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_source(path: str) -> bytes:
+    import os
+    if os.path.isdir(path):
+        # a sharded member is reassembled from its shard files
+        return assemble_shards(path).encode("utf-8")
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def _source_stat(path: str | list[str]) -> tuple[int, int]:
+    """Size and modification time of a source file, shard directory or bundle."""
+    import os
+    if isinstance(path, list):
+        stats = [os.stat(p) for p in path]
+        return sum(st.st_size for st in stats), max((st.st_mtime_ns for st in stats), default=0)
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    size = mtime_ns = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            st = os.stat(os.path.join(root, name))
+            size += st.st_size
+            mtime_ns = max(mtime_ns, st.st_mtime_ns)
+    return size, mtime_ns
+
+
+def _compress_file(member: str, path: str, date_time: tuple, data: bytes | None = None) -> RawZipMember:
+    import zipfile
+    import zlib
+    if data is None:
+        data = _read_source(path)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    # already compressed assets (images, sounds) are stored instead
+    if len(deflated) < len(data):
+        return RawZipMember(member, zipfile.ZIP_DEFLATED, zlib.crc32(data), len(data), deflated, date_time)
+    return RawZipMember(member, zipfile.ZIP_STORED, zlib.crc32(data), len(data), data, date_time)
+
+
+class Build:
+
+    def __init__(self, cfg: Config, jobs: int = 0, minifier: ScriptMinifier | None = None) -> None:
+        self.cfg = cfg
+        self.jobs = jobs
+        # strips the scripts of release builds if set, see minify.py
+        self.minifier = minifier
+
+    @staticmethod
+    def record_path(workdir: str) -> str:
+        import os
+        return os.path.join(workdir, "build", "build-manifest.json")
+
+    def collect_sources(self, workdir: str, release: bool, bundle: bool = False) -> dict[str, str | list[str]]:
+        """Map archive member names to the files of the development directory.
+
+        With `bundle`, the scripts of a release build are mapped to a single
+        member, see bundle_order.
+        """
+        import os
+        sources = {}
+        mission_dir = os.path.join(workdir, "mission")
+        for root, dirs, files in os.walk(mission_dir):
+            for name in [d for d in dirs if d.endswith(SHARDS_SUFFIX)]:
+                # the shards of a member are packed as the member itself
+                dirs.remove(name)
+                path = os.path.join(root, name)
+                sources[os.path.relpath(path, mission_dir)[:-len(SHARDS_SUFFIX)].replace(os.sep, "/")] = path
+            for name in files:
+                if name in _PLACEHOLDERS:
+                    continue
+                path = os.path.join(root, name)
+                sources[os.path.relpath(path, mission_dir).replace(os.sep, "/")] = path
+        if release:
+            # the release flavor embeds the scripts as mission resources
+            scripts_dir = os.path.join(workdir, "scripts")
+            bundled = self.bundle_order(workdir) if bundle else []
+            if bundled:
+                sources[BUNDLE_MEMBER] = bundled
+            for root, _, files in os.walk(scripts_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    if not name.endswith(".lua") or path in bundled:
+                        continue
+                    member = f"I10n/Default/{name}"
+                    if member in sources:
+                        raise ValueError(f"Script {name} is embedded more than once")
+                    sources[member] = path
+        return dict(sorted(sources.items()))
+
+    @staticmethod
+    def bundle_order(workdir: str) -> list[str]:
+        """Scripts to bundle, in the order they are loaded.
+
+        configs/bundle.txt lists script paths relative to scripts/, one per
+        line; scripts not listed are embedded on their own. Without the
+        file, all scripts are bundled in the order of their paths.
+        """
+        import os
+        scripts_dir = os.path.join(workdir, "scripts")
+        try:
+            with open(os.path.join(workdir, "configs", BUNDLE_ORDER_FILE), "r", encoding="utf-8") as fh:
+                names = [line.strip() for line in fh if line.strip() and not line.lstrip().startswith("#")]
+        except FileNotFoundError:
+            names = sorted(os.path.relpath(os.path.join(root, name), scripts_dir).replace(os.sep, "/")
+                           for root, _, files in os.walk(scripts_dir) for name in files if name.endswith(".lua"))
+        paths = []
+        for name in names:
+            path = os.path.join(scripts_dir, *name.split("/"))
+            if not os.path.isfile(path):
+                raise ValueError(f"Script {name} listed in {BUNDLE_ORDER_FILE} does not exist")
+            paths.append(path)
+        return paths
+
+    def read_member(self, member: str, path: str | list[str], workdir: str) -> bytes:
+        """Content of `member` as written to the archive: scripts are minified and bundled."""
+        import os
+        if isinstance(path, list):
+            from ssf_mission_tools.minify import bundle_lua
+            scripts_dir = os.path.join(workdir, "scripts")
+            return bundle_lua((os.path.relpath(p, scripts_dir).replace(os.sep, "/"), self.read_member(member, p, workdir))
+                              for p in path)
+        data = _read_source(path)
+        scripts_dir = os.path.abspath(os.path.join(workdir, "scripts"))
+        if self.minifier is not None and os.path.abspath(path).startswith(scripts_dir + os.sep):
+            data = self.minifier.minify(data)
+        return data
+
+    def load_record(self, workdir: str) -> dict:
+        import json
+        try:
+            with open(self.record_path(workdir), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except Exception:
+            return {}
+
+    def save_record(self, workdir: str, record: dict) -> None:
+        import json
+        import os
+        path = self.record_path(workdir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(record, fh, indent=2, sort_keys=True)
+
+    def build(self, workdir: str, output: str, release: bool = False, bundle: bool = False) -> tuple[int, int]:
+        """Write the .miz for `workdir` to `output`.
+
+        Members whose source is unchanged since the previous build are copied
+        from the previous archive without recompressing them; the others are
+        compressed in a thread pool. Returns the number of reused and
+        compressed members.
+        """
+        import hashlib
+        import os
+        import time
+        import zipfile
+        from concurrent.futures import ThreadPoolExecutor
+        with phase("collect"):
+            sources = self.collect_sources(workdir, release, bundle)
+            record = self.load_record(workdir)
+        minify = self.minifier is not None
+        same_output = record.get("output") == os.path.abspath(output) and record.get("minify", False) == minify
+        previous = record.get("members", {}) if same_output else {}
+
+        # hash only sources whose size or mtime changed since the last build
+        entries = {}
+        assembled: dict[str, bytes] = {}
+        with phase("hash"):
+            for member, path in sources.items():
+                size, mtime_ns = _source_stat(path)
+                old = previous.get(member)
+                if isinstance(path, list):
+                    # the order of the bundled scripts matters as much as their content
+                    sha = hashlib.sha256("\0".join([_BUNDLE_VERSION] + [f"{p}:{_file_sha256(p)}" for p in path])
+                                         .encode()).hexdigest()
+                elif old and old["size"] == size and old["mtime_ns"] == mtime_ns:
+                    sha = old["sha256"]
+                elif os.path.isdir(path):
+                    assembled[member] = _read_source(path)
+                    sha = hashlib.sha256(assembled[member]).hexdigest()
+                else:
+                    sha = _file_sha256(path)
+                entries[member] = {"size": size, "mtime_ns": mtime_ns, "sha256": sha,
+                                   "date_time": time.localtime(mtime_ns / 1e9)[:6]}
+
+        members: dict[str, RawZipMember] = {}
+        with phase("reuse"):
+            if previous and os.path.exists(output):
+                try:
+                    with zipfile.ZipFile(output, "r") as z, open(output, "rb") as fh:
+                        for info in z.infolist():
+                            old, new = previous.get(info.filename), entries.get(info.filename)
+                            if not old or not new or old["sha256"] != new["sha256"] or old.get("crc") != info.CRC:
+                                continue
+                            members[info.filename] = RawZipMember(info.filename, info.compress_type, info.CRC,
+                                                                  info.file_size, read_raw_member(fh, info), info.date_time)
+                except (OSError, zipfile.BadZipFile):
+                    members = {}
+        reused = len(members)
+
+        def compress(m: str) -> RawZipMember:
+            data = assembled[m] if m in assembled else self.read_member(m, sources[m], workdir)
+            return _compress_file(m, sources[m], entries[m]["date_time"], data)
+
+        changed = [m for m in sources if m not in members]
+        with phase("compress"):
+            with ThreadPoolExecutor(max_workers=self.jobs or os.cpu_count() or 1) as pool:
+                for raw in pool.map(compress, changed):
+                    members[raw.name] = raw
+
+        with phase("write"):
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            tmp = output + ".tmp"
+            write_raw_zip(tmp, (members[m] for m in sources))
+            os.replace(tmp, output)
+
+        for member, entry in entries.items():
+            entry.pop("date_time")
+            entry["crc"] = members[member].crc
+        self.save_record(workdir, {"output": os.path.abspath(output), "release": release, "minify": minify,
+                                   "members": entries})
+        return reused, len(changed)
+
+    @classmethod
+    def add_subparser(cls, parser: ArgumentParser) -> None:
+        parser.add_argument("-d", "--directory", type=str, default=".", help="Development directory to build")
+        parser.add_argument("-o", "--output", type=str, help="Output .miz file (default: build/<mission name>)")
+        parser.add_argument("--release", action="store_true", help="Embed the scripts into the .miz file")
+        parser.add_argument("--minify", action="store_true", help="Strip comments and whitespace from the embedded scripts (release only)")
+        parser.add_argument("--bundle", action="store_true",
+                            help=f"Embed the scripts as one {BUNDLE_MEMBER}, in the order of configs/{BUNDLE_ORDER_FILE} (release only)")
+        parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker threads for compressing changed files (0: one per CPU core)")
+
+    @classmethod
+    def handle_arguments(cls, args: Any, cfg: Config) -> int:
+        import os
+        import time
+        workdir = args.directory
+        if not os.path.isdir(os.path.join(workdir, "mission")):
+            print(f"Directory {workdir} is not a development directory")
+            return -1
+        output = args.output
+        if not output:
+            manifest = SyncManifest.load(workdir)
+            mission_name = manifest.mission if manifest else os.path.basename(os.path.abspath(workdir)) + ".miz"
+            output = os.path.join(workdir, "build", mission_name)
+        minify = getattr(args, "minify", False)
+        bundle = getattr(args, "bundle", False)
+        if (minify or bundle) and not args.release:
+            print("--minify and --bundle only apply to release builds")
+            return -1
+        jobs = args.jobs if args.jobs is not None else cfg.jobs
+        minifier = None
+        if minify:
+            from ssf_mission_tools.minify import ScriptMinifier
+            minifier = ScriptMinifier.with_default_cache(cfg.cache_max_mb * 1024 * 1024)
+        flavor = "release" if args.release else "dev"
+        print(f"Building {flavor} mission {output}...")
+        start = time.perf_counter()
+        try:
+            reused, compressed = Build(cfg, jobs, minifier).build(workdir, output, args.release, bundle)
+        except (OSError, ValueError) as e:
+            print(f"Build failed: {e}")
+            return -1
+        print(f"Built {output} in {time.perf_counter() - start:.2f}s ({reused} reused, {compressed} compressed)")
+        if minifier is not None and minifier.stats.scripts:
+            print(minifier.stats.summary())
+        return 0
@@ -0,0 +1,161 @@
+"""On-disk cache of parsed Lua table files.
+
+Entries are keyed by a content hash of the source file and stored as pickles
+in the user's cache directory (per-platform). The cache has a size cap;
+least recently used entries are evicted first.
+"""
+from __future__ import annotations
+
+from argparse import ArgumentParser
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+from ssf_mission_tools.common import user_cache_dir
+
+# bump whenever the structure produced by the parser changes
+_CACHE_VERSION = b"ssf-parse-cache-2"
+_SUFFIX = ".pickle"
+
+DEFAULT_MAX_MB = 256
+
+
+class ParseCache:
+
+    # set by a long-running process so that every command shares one cache
+    # and its in-memory layer, see daemon.py
+    shared: ParseCache | None = None
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 memory_entries: int = 0) -> None:
+        self.directory = Path(directory) if directory is not None else user_cache_dir("ssf-mission-tools") / "parsed"
+        self.max_bytes = max_bytes
+        # long-running processes keep the most recent results in memory too
+        self.memory_entries = memory_entries
+        self._memory: dict[str, Any] = {}
+
+    def __getstate__(self) -> dict:
+        # worker processes get the disk cache only
+        state = self.__dict__.copy()
+        state["_memory"] = {}
+        return state
+
+    def _remember(self, key: str, value: Any) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory.pop(key, None)
+        self._memory[key] = value
+        while len(self._memory) > self.memory_entries:
+            del self._memory[next(iter(self._memory))]
+
+    @classmethod
+    def for_config(cls, cfg: Any, memory_entries: int = 0) -> ParseCache:
+        """The cache commands use: the shared one if set, else a new one sized by `cfg`."""
+        if cls.shared is not None:
+            return cls.shared
+        return cls(max_bytes=cfg.cache_max_mb * 1024 * 1024, memory_entries=memory_entries)
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        return hashlib.sha256(_CACHE_VERSION + data).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / (key + _SUFFIX)
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        if not self.directory.is_dir():
+            return []
+        entries = []
+        for p in self.directory.glob("*" + _SUFFIX):
+            try:
+                entries.append((p, p.stat()))
+            except OSError:
+                continue
+        return entries
+
+    def get(self, key: str) -> Any | None:
+        if key in self._memory:
+            value = self._memory[key]
+            self._remember(key, value)
+            return value
+        p = self._entry(key)
+        try:
+            with p.open("rb") as fh:
+                value = pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupt or incompatible entry, drop it and re-parse
+            p.unlink(missing_ok=True)
+            return None
+        # refresh mtime so eviction sees this entry as recently used
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        p = self._entry(key)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+        try:
+            with tmp.open("wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, p)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits its cap."""
+        entries = self._entries()
+        total = sum(st.st_size for _, st in entries)
+        removed = 0
+        for p, st in sorted(entries, key=lambda e: e[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= st.st_size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        self._memory.clear()
+        removed = 0
+        for p, _ in self._entries():
+            try:
+                p.unlink()
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def usage(self) -> tuple[int, int]:
+        entries = self._entries()
+        return len(entries), sum(st.st_size for _, st in entries)
+
+    @classmethod
+    def add_subparser(cls, parser: ArgumentParser) -> None:
+        cache_sub = parser.add_subparsers(dest="cache_cmd", required=False)
+        cache_sub.add_parser("show", help="Show location and size of the parse cache")
+        cache_sub.add_parser("clear", help="Delete all cached parse results")
+
+    @classmethod
+    def handle_arguments(cls, args: Any, cfg: Any) -> int:
+        cache = cls(max_bytes=cfg.cache_max_mb * 1024 * 1024)
+        if getattr(args, "cache_cmd", None) == "clear":
+            removed = cache.clear()
+            print(f"Removed {removed} cache entries from {cache.directory}")
+            return 0
+        count, size = cache.usage()
+        print(f"{cache.directory}: {count} entries, {size / (1024 * 1024):.1f} MB of {cfg.cache_max_mb} MB")
+        return 0
@@ -1,35 +1,98 @@
 """Command-line interface for ssf_mission_tools."""
 from __future__ import annotations
 
-import argparse
 import sys
-from dataclasses import asdict
-from .config import Config
-from .init import Init
+from importlib import import_module
 
-def create_parser() -> argparse.ArgumentParser:
+# typing and argparse are only needed by type checkers and the slow path
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from typing import Any
+
+# command -> (module, class, help). Command modules are only imported for
+# the command that is run, so `--version`, `--help` and light commands start
+# without loading the mission tooling.
+COMMANDS: dict[str, tuple[str, str, str]] = {
+    "init": ("ssf_mission_tools.init", "Init", "Initialize development directory"),
+    "update": ("ssf_mission_tools.update", "Update", "Update mission files in development directory from the DCS mission"),
+    "build": ("ssf_mission_tools.build", "Build", "Build the .miz file from the development directory"),
+    "diff": ("ssf_mission_tools.diff", "Diff", "Show the changed tables and values between two missions"),
+    "query": ("ssf_mission_tools.query", "Query", "List units, groups, triggers or dictionary keys of a mission as JSON"),
+    "config": ("ssf_mission_tools.config", "Config", "Configure scripts"),
+    "cache": ("ssf_mission_tools.cache", "ParseCache", "Show or clear the cache of parsed Lua files"),
+    "daemon": ("ssf_mission_tools.daemon", "Daemon", "Start, stop or show the daemon that runs commands for the CLI"),
+}
+
+# global options that take a value, skipped when looking for the command
+_VALUE_OPTIONS = {"--timings-json", "--profile", "--profile-output"}
+
+
+def _command_class(command: str) -> Any:
+    module, name, _ = COMMANDS[command]
+    return getattr(import_module(module), name)
+
+
+def find_command(argv: list[str]) -> str | None:
+    """Return the subcommand named in `argv` without parsing the arguments."""
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in _VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith("-"):
+            return arg if arg in COMMANDS else None
+    return None
+
+
+def create_parser(command: str | None = None) -> argparse.ArgumentParser:
+    import argparse
     # disable argparse's automatic top-level help so we can control exit code
     parser = argparse.ArgumentParser(prog="ssf-mission-tools", add_help=False)
     parser.add_argument("-h", "--help", action="store_true", help="Show this help and exit")
     parser.add_argument("--version", action="store_true", help="Show version and exit")
+    parser.add_argument("--timings", action="store_true", help="Print wall time, CPU time and memory of each phase")
+    parser.add_argument("--timings-json", type=str, metavar="FILE", help="Write the timings of each phase as JSON to FILE")
+    parser.add_argument("--trace-memory", action="store_true", help="Record the tracemalloc peak of each phase (slower)")
+    parser.add_argument("--profile", type=str, metavar="PHASE", help="Write a cProfile file for PHASE, e.g. 'sort' or 'sort/mission' (with -j 1)")
+    parser.add_argument("--profile-output", type=str, metavar="FILE", help="cProfile output file (default: ssf-tools-<PHASE>.prof)")
+    parser.add_argument("--no-daemon", action="store_true", help="Run the command in this process even if a daemon is running")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    init= subparsers.add_parser("init", help="Initialize development directory")
-    Init.add_subparser(init)
-    
-    update = subparsers.add_parser("update", help="Update mission files in development directory from the DCS mission")
-    
-    build = subparsers.add_parser("build", help="Build the .miz file from the development directory")
-    
-    config = subparsers.add_parser("config", help="Configure scripts")
-    Config.add_subparser(config)
+    # only the selected command registers its arguments
+    for name, (_, _, help_text) in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        if name == command:
+            _command_class(name).add_subparser(sub)
+            from .daemon import DAEMON_COMMANDS
+            if name in DAEMON_COMMANDS:
+                # also accepted after the command; SUPPRESS keeps the global value
+                sub.add_argument("--no-daemon", action="store_true", default=argparse.SUPPRESS,
+                                 help="Run the command in this process even if a daemon is running")
     return parser
 
-def main(argv: list[str] | None = None) -> int:
+def main(argv: list[str] | None = None, use_daemon: bool = True) -> int:
     argv = list(argv) if argv is not None else sys.argv[1:]
-    parser = create_parser()
+    command = find_command(argv)
+    if use_daemon and command is not None and not {"--no-daemon", "--watch", "-h", "--help"}.intersection(argv):
+        from .daemon import DAEMON_COMMANDS, run_in_daemon
+        if command in DAEMON_COMMANDS:
+            # a running daemon answers without starting up; without one, run here
+            rc = run_in_daemon(argv)
+            if rc is not None:
+                return rc
+    if command is None:
+        # fast paths: neither needs a command module or the configuration
+        if "--version" in argv:
+            from . import __version__
+            print(__version__)
+            return 0
+        if "-h" in argv or "--help" in argv:
+            create_parser().print_help()
+            return 2
+    parser = create_parser(command)
     args = parser.parse_args(argv)
-    cfg = Config.load_or_default()
     if getattr(args, "version", False):
         from . import __version__
         print(__version__)
@@ -40,12 +103,30 @@ def main(argv: list[str] | None = None) -> int:
         parser.print_help()
         return 2
 
-    if args.command == "config":
-        return Config.handle_arguments(args, cfg)
-    
-    elif args.command == "init":
-        from .init import Init
-        return Init.handle_arguments(args, cfg)
+    from .config import Config
+    from .timings import TIMINGS
+    cfg = Config.load_or_default()
+    TIMINGS.configure(
+        enabled=args.timings or bool(args.timings_json),
+        trace_memory=args.trace_memory,
+        profile_phase=args.profile,
+        profile_output=args.profile_output,
+    )
+    rc = run_command(parser, args, cfg)
+    if TIMINGS.enabled:
+        if args.timings_json:
+            import json
+            with open(args.timings_json, "w", encoding="utf-8") as fh:
+                json.dump(TIMINGS.to_json(), fh, indent=2)
+        if args.timings or args.trace_memory:
+            print(TIMINGS.format_table())
+    # the daemon runs further commands in this process
+    TIMINGS.close()
+    return rc
+
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace, cfg: Any) -> int:
+    if args.command in COMMANDS:
+        return _command_class(args.command).handle_arguments(args, cfg)
 
     parser.print_help()
     return 0
@@ -1,40 +1,73 @@
+from __future__ import annotations
+
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ssf_mission_tools.filesync import SyncStats
+
+# .miz members holding Lua tables; they are stored sorted in mission/ so that
+# git diffs only show meaningful changes
+SORTED_LUA_MEMBERS = ("I10n/Default/dictionary", "I10n/Default/mapResource", "mission", "options", "warehouses")
+
+# glob patterns of the members stored in mission/, for extracting only those;
+# they are matched case-insensitively, DCS stores the kneeboard as KNEEBOARD/
+SYNCED_MEMBER_PATTERNS = SORTED_LUA_MEMBERS + ("theatre", "I10n/*", "kneeboard/*")
+
+def is_synced_member(member: str) -> bool:
+    """Whether a .miz member is stored in the mission/ directory.
+
+    The same test as extracting with `SYNCED_MEMBER_PATTERNS` and ignore_case.
+    """
+    from fnmatch import fnmatchcase
+    name = member.lower()
+    return any(fnmatchcase(name, p.lower()) for p in SYNCED_MEMBER_PATTERNS)
+
+def user_cache_dir(app_name: str) -> Path:
+    # Follow XDG on *nix, use %LOCALAPPDATA% on Windows, fallback to home
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / app_name
 
 def expand_path(path_str: str) -> str:
     expanded = os.path.expandvars(path_str)
     return Path(expanded).expanduser().as_posix()
 
-def copy_kneeboard(workdir: str) -> None:
-    import shutil
-    import os
-    kneeboard_src = os.path.join(workdir, "build", "kneeboard")
-    kneeboard_dst = os.path.join(workdir, "mission", "kneeboard")
+def _find_entry(directory: str, name: str) -> str | None:
+    """The name of the entry of `directory` that equals `name` ignoring case."""
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return None
+    if name in entries:
+        return name
+    return next((e for e in sorted(entries) if e.lower() == name.lower()), None)
+
+def copy_kneeboard(workdir: str) -> SyncStats | None:
+    from ssf_mission_tools.filesync import sync_tree
+    # the .miz may spell it kneeboard/ or KNEEBOARD/; keep the spelling
+    name = _find_entry(os.path.join(workdir, "build"), "kneeboard")
+    if name is None:
+        return None
+    kneeboard_src = os.path.join(workdir, "build", name)
+    kneeboard_dst = os.path.join(workdir, "mission", name)
     if not os.path.isdir(kneeboard_src):
-        return
-    shutil.copytree(kneeboard_src, kneeboard_dst, dirs_exist_ok=True)
+        return None
+    # keep the placeholder created by init, it is not part of the mission
+    return sync_tree(kneeboard_src, kneeboard_dst, skip_names=("place_images_here",))
 
-def copy_resources(workdir: str) -> None:
-    import shutil
-    import os
+def copy_resources(workdir: str) -> SyncStats | None:
+    from ssf_mission_tools.filesync import sync_tree
     resources_src = os.path.join(workdir, "build", "I10n")
     resources_dst = os.path.join(workdir, "mission", "I10n")
     # only proceed if the source directory exists
     if not os.path.isdir(resources_src):
-        return
-
-    # ensure destination parent exists
-    os.makedirs(resources_dst, exist_ok=True)
+        return None
 
     # copy everything except these resource names
     # the files in skip_names need to be sanitized and copied separately to allow proper handling in git
     skip_names = {"dictionary", "mapResource"}
-    for name in os.listdir(resources_src):
-        if name in skip_names:
-            continue
-        src_path = os.path.join(resources_src, name)
-        dst_path = os.path.join(resources_dst, name)
-        if os.path.isdir(src_path):
-            shutil.copytree(src_path, dst_path, dirs_exist_ok=True)
-        else:
-            shutil.copy2(src_path, dst_path)
\ No newline at end of file
+    return sync_tree(resources_src, resources_dst, skip_names=skip_names)
@@ -8,7 +8,7 @@ from __future__ import annotations
 from argparse import ArgumentParser
 import json
 import os
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
 from typing import Any
 
@@ -22,6 +22,7 @@ def get_dcs_saved_games_dir() -> Path:
         return standard_path
     elif os.path.exists(open_beta_path):
         return open_beta_path
+    return standard_path
     
 def get_dcs_saved_games_missions_dir():
     saved_games_dir = get_dcs_saved_games_dir()
@@ -37,15 +38,32 @@ def _user_config_dir(app_name: str) -> Path:
         base = os.getenv("XDG_CONFIG_HOME") or Path.home() / ".config"
     return Path(base) / app_name
 
+# placeholder for settings that are resolved when they are first read
+_UNRESOLVED = object()
+
 @dataclass
 class Config:
     #extra: Dict[str, Any] = field(default_factory=dict)
-    mission_dir: str = field(default_factory=lambda: get_dcs_saved_games_missions_dir().as_posix())
+    # resolved on first read, probing the DCS Saved Games folder is not free
+    mission_dir: str = field(default_factory=lambda: _UNRESOLVED)
     dcs_path: str = "C:/Program Files/Eagle Dynamics/DCS World"
+    cache_max_mb: int = 256
+    jobs: int = 0
     
     _app_name: str = field(init=False, repr=False, default="ssf-mission-tools")
     _file_name: str = field(init=False, repr=False, default="config.json")
 
+    def __post_init__(self) -> None:
+        if self.mission_dir is _UNRESOLVED:
+            # without an instance attribute, reads go through __getattr__
+            del self.mission_dir
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "mission_dir":
+            self.mission_dir = get_dcs_saved_games_missions_dir().as_posix()
+            return self.mission_dir
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
     @property
     def _path(self) -> Path:
         return _user_config_dir(self._app_name) / "ssf-mission-tools.config.json"
@@ -59,12 +77,13 @@ class Config:
                 data = json.load(fh)
         except Exception:
             return
-        # Merge keys from JSON onto this dataclass
+        # Merge keys from JSON onto this dataclass. hasattr() would resolve
+        # mission_dir through __getattr__, probing the DCS folder for a
+        # value that is replaced right away.
+        names = {f.name for f in fields(self)}
         for k, v in data.items():
-            if hasattr(self, k):
+            if k in names:
                 setattr(self, k, v)
-            else:
-                self.extra[k] = v
 
     def save(self) -> None:
         p = self._path
@@ -92,6 +111,8 @@ class Config:
         cfg_delete = cfg_sub.add_parser("delete", help="Delete the configuration file")
         cfg_save.add_argument("--mission-dir", type=str, help="Change mission directory of DCS")
         cfg_save.add_argument("--dcs-path", type=str, help="Change DCS installation path")
+        cfg_save.add_argument("--cache-max-mb", type=int, help="Change size limit of the parse cache in MB")
+        cfg_save.add_argument("--jobs", type=int, help="Change number of worker processes (0: one per CPU core)")
 
     @classmethod
     def handle_arguments(cls, args: Any, cfg: "Config") -> None:
@@ -107,6 +128,10 @@ class Config:
                 cfg.mission_dir = expand_path(args.mission_dir)
             if args.dcs_path:
                 cfg.dcs_path = expand_path(args.dcs_path)
+            if args.cache_max_mb is not None:
+                cfg.cache_max_mb = args.cache_max_mb
+            if args.jobs is not None:
+                cfg.jobs = args.jobs
             cfg.save()
             print(f"Saved config to {cfg._path}")
             return 0
@@ -0,0 +1,229 @@
+"""Optional background process that runs commands for the CLI.
+
+`ssf-tools daemon start` keeps a process running that accepts `update`,
+`build`, `diff` and `query` requests on a Unix socket (a named pipe on Windows).
+When it is running, the CLI sends its arguments and working directory to
+it and prints the output it gets back, so a command does not pay for
+starting Python, importing the tooling and loading parse results from the
+disk cache: the daemon keeps recently parsed Lua tables in memory. When no
+daemon answers, the CLI runs the command itself.
+
+Connections are authenticated with a random key that is stored with user
+only permissions next to the socket.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING, Any
+
+from ssf_mission_tools.common import user_cache_dir
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+
+# commands the CLI hands to a running daemon
+DAEMON_COMMANDS = frozenset(("update", "build", "diff", "query"))
+# parse results the daemon keeps in memory
+MEMORY_ENTRIES = 32
+_NAME = "ssf-mission-tools"
+
+
+def _runtime_dir() -> str:
+    return os.getenv("XDG_RUNTIME_DIR") or str(user_cache_dir(_NAME))
+
+
+def daemon_address() -> tuple[str, str]:
+    """Address and family of the daemon's listener."""
+    if sys.platform == "win32":
+        user = os.getenv("USERNAME", "user")
+        return rf"\\.\pipe\{_NAME}-{user}", "AF_PIPE"
+    return os.path.join(_runtime_dir(), f"{_NAME}.sock"), "AF_UNIX"
+
+
+def _key_path() -> str:
+    return str(user_cache_dir(_NAME) / "daemon.key")
+
+
+def _read_key() -> bytes | None:
+    try:
+        with open(_key_path(), "rb") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def _new_key() -> bytes:
+    import secrets
+    key = secrets.token_bytes(32)
+    path = _key_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(key)
+    return key
+
+
+def _connect() -> Any | None:
+    """Connection to a running daemon, None if none answers."""
+    address, family = daemon_address()
+    if family == "AF_UNIX" and not os.path.exists(address):
+        return None
+    key = _read_key()
+    if key is None:
+        return None
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Client
+    try:
+        return Client(address, family, authkey=key)
+    except (OSError, EOFError, AuthenticationError):
+        # not running any more, or started with another key
+        return None
+
+
+def _exchange(conn: Any, message: dict) -> dict | None:
+    import json
+    try:
+        with conn:
+            conn.send_bytes(json.dumps(message).encode("utf-8"))
+            return json.loads(conn.recv_bytes().decode("utf-8"))
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+def run_in_daemon(argv: list[str]) -> int | None:
+    """Run a CLI command in the daemon, return its exit code or None if it could not."""
+    from ssf_mission_tools import __version__
+    conn = _connect()
+    if conn is None:
+        return None
+    reply = _exchange(conn, {"request": "run", "argv": argv, "cwd": os.getcwd(), "version": __version__})
+    if reply is None or "rc" not in reply:
+        return None
+    sys.stdout.write(reply.get("output", ""))
+    sys.stdout.flush()
+    return reply["rc"]
+
+
+class DaemonServer:
+    """Serve requests one at a time; each runs like a CLI call in the client's directory."""
+
+    def __init__(self, cfg: Any) -> None:
+        from ssf_mission_tools.cache import ParseCache
+        self.cfg = cfg
+        self.requests = 0
+        self.running = False
+        # commands use this cache, so parse results outlive a request
+        ParseCache.shared = ParseCache(max_bytes=cfg.cache_max_mb * 1024 * 1024, memory_entries=MEMORY_ENTRIES)
+
+    def handle(self, message: dict) -> dict:
+        from ssf_mission_tools import __version__
+        request = message.get("request")
+        if message.get("version") != __version__:
+            return {"error": f"daemon runs version {__version__}"}
+        if request == "status":
+            return {"pid": os.getpid(), "requests": self.requests}
+        if request == "stop":
+            self.running = False
+            return {"stopped": True}
+        if request == "run":
+            argv = list(message.get("argv", []))
+            from ssf_mission_tools.cli import find_command
+            if find_command(argv) not in DAEMON_COMMANDS:
+                return {"error": "command is not served by the daemon"}
+            self.requests += 1
+            return self.run(argv, message.get("cwd") or os.getcwd())
+        return {"error": f"unknown request {request!r}"}
+
+    @staticmethod
+    def run(argv: list[str], cwd: str) -> dict:
+        import contextlib
+        import io
+        import traceback
+        from ssf_mission_tools.cli import main
+        out = io.StringIO()
+        previous = os.getcwd()
+        try:
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                try:
+                    rc = main(argv, use_daemon=False)
+                except SystemExit as e:
+                    # argparse errors
+                    rc = e.code if isinstance(e.code, int) else 2
+                except Exception:
+                    traceback.print_exc()
+                    rc = -1
+        except OSError as e:
+            return {"rc": -1, "output": f"Cannot run in {cwd}: {e}\n"}
+        finally:
+            os.chdir(previous)
+        return {"rc": rc, "output": out.getvalue()}
+
+    def serve(self) -> None:
+        import json
+        from multiprocessing import AuthenticationError
+        from multiprocessing.connection import Listener
+        address, family = daemon_address()
+        if family == "AF_UNIX":
+            os.makedirs(os.path.dirname(address), exist_ok=True)
+            if os.path.exists(address):
+                # left behind by a daemon that did not shut down cleanly
+                os.remove(address)
+        key = _new_key()
+        self.running = True
+        with Listener(address, family, authkey=key) as listener:
+            print(f"Daemon {os.getpid()} listening on {address}")
+            while self.running:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    # a client gone or with a stale key
+                    continue
+                with conn:
+                    try:
+                        message = json.loads(conn.recv_bytes().decode("utf-8"))
+                        conn.send_bytes(json.dumps(self.handle(message)).encode("utf-8"))
+                    except (OSError, EOFError, ValueError):
+                        continue
+        if family == "AF_UNIX" and os.path.exists(address):
+            os.remove(address)
+
+
+class Daemon:
+
+    @classmethod
+    def add_subparser(cls, parser: ArgumentParser) -> None:
+        sub = parser.add_subparsers(dest="daemon_cmd", required=True)
+        sub.add_parser("start", help="Run the daemon in this terminal until it is stopped")
+        sub.add_parser("stop", help="Stop the running daemon")
+        sub.add_parser("status", help="Show whether a daemon is running")
+
+    @classmethod
+    def handle_arguments(cls, args: Any, cfg: Any) -> int:
+        from ssf_mission_tools import __version__
+        if args.daemon_cmd == "start":
+            conn = _connect()
+            if conn is not None:
+                conn.close()
+                print("A daemon is already running")
+                return -1
+            try:
+                DaemonServer(cfg).serve()
+            except KeyboardInterrupt:
+                pass
+            print("Daemon stopped")
+            return 0
+        conn = _connect()
+        reply = _exchange(conn, {"request": args.daemon_cmd, "version": __version__}) if conn is not None else None
+        if reply is None:
+            print("No daemon is running")
+            return -1 if args.daemon_cmd == "stop" else 0
+        if "error" in reply:
+            print(f"Daemon error: {reply['error']}")
+            return -1
+        if args.daemon_cmd == "stop":
+            print("Daemon stopped")
+        else:
+            print(f"Daemon {reply['pid']} is running, {reply['requests']} request(s) served")
+        return 0
@@ -0,0 +1,237 @@
+"""Structural diff of two missions at the level of their parsed Lua tables.
+
+Every table of both missions gets a hash of its content, built bottom-up
+from the hashes of its subtables, so identical branches are skipped with a
+single comparison and only the paths that changed are visited. Changes are
+reported by path, for example `coalition.blue.country[2].plane.group[5].units[1].x`.
+"""
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from typing import Any
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.common import SORTED_LUA_MEMBERS, is_synced_member
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.parse_lua import TABLE_TYPES, natural_key, table_items
+from ssf_mission_tools.timings import phase
+
+
+@dataclass
+class Change:
+    member: str
+    path: str
+    kind: str  # "added", "removed" or "changed"
+    old: Any = None
+    new: Any = None
+
+    def format(self) -> str:
+        if not self.path and self.old is None and self.new is None:
+            # a whole member that is not a Lua table, e.g. a kneeboard image
+            return f"{_SIGNS[self.kind]} {self.member}"
+        where = f"{self.member}: {self.path}" if self.path else self.member
+        if self.kind == "added":
+            return f"+ {where} = {_format_value(self.new)}"
+        if self.kind == "removed":
+            return f"- {where} = {_format_value(self.old)}"
+        return f"~ {where}: {_format_value(self.old)} -> {_format_value(self.new)}"
+
+
+_SIGNS = {"added": "+", "removed": "-", "changed": "~"}
+
+
+def _format_value(v: Any) -> str:
+    if type(v) in TABLE_TYPES:
+        return f"{{{len(v)} entries}}" if v else "{}"
+    if isinstance(v, str):
+        return '"%s"' % v.replace('"', '\\"')
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if v is None:
+        return "nil"
+    return str(v)
+
+
+def join_path(path: str, key: Any) -> str:
+    """Append a table key to a path: `a.name`, `a[2]` or `a["odd key"]`."""
+    if type(key) is str:
+        if key.isidentifier():
+            return f"{path}.{key}" if path else key
+        return '%s["%s"]' % (path, key.replace('"', '\\"'))
+    return f"{path}[{_format_value(key)}]"
+
+
+def subtree_hashes(data: Any) -> dict[int, bytes]:
+    """Map the id() of every table in `data` to a digest of its content.
+
+    The digest is a BLAKE2b hash of the sorted entries of the table: the
+    repr of each key with the type and repr of its scalar or the digest of
+    its subtable. It does not depend on the order of the entries, and unlike
+    the built-in hash(), values such as -1 and -2 do not collide.
+    """
+    from hashlib import blake2b
+    hashes: dict[int, bytes] = {}
+
+    def visit(obj: Any) -> bytes:
+        entries = []
+        for k, v in table_items(obj):
+            if type(v) in TABLE_TYPES:
+                entries.append("%r\tt\t%s" % (k, visit(v).hex()))
+            else:
+                # the type keeps 1, 1.0 and true apart
+                entries.append("%r\t%s\t%r" % (k, type(v).__name__, v))
+        # repr() escapes line breaks, so the entries cannot run together
+        entries.sort()
+        h = hashes[id(obj)] = blake2b("\n".join(entries).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        return h
+
+    if type(data) in TABLE_TYPES:
+        visit(data)
+    return hashes
+
+
+# subtree hashes of trees served from the shared in-memory parse cache of a
+# long-running process, which returns the same objects on every request;
+# the tree is kept with its hashes so its id() is not reused
+_MEMO_SIZE = 8
+_hash_memo: dict[int, tuple[Any, dict[int, bytes]]] = {}
+
+
+def _tree_hashes(data: Any) -> dict[int, bytes]:
+    from ssf_mission_tools.cache import ParseCache
+    if ParseCache.shared is None or ParseCache.shared.memory_entries <= 0:
+        return subtree_hashes(data)
+    entry = _hash_memo.pop(id(data), None)
+    if entry is None or entry[0] is not data:
+        entry = (data, subtree_hashes(data))
+    _hash_memo[id(data)] = entry
+    while len(_hash_memo) > _MEMO_SIZE:
+        del _hash_memo[next(iter(_hash_memo))]
+    return entry[1]
+
+
+def diff_tables(old: Any, new: Any, member: str = "") -> list[Change]:
+    """Return the changes from the table `old` to the table `new`."""
+    old_hashes, new_hashes = _tree_hashes(old), _tree_hashes(new)
+    changes: list[Change] = []
+
+    def visit(a: Any, b: Any, path: str) -> None:
+        a_items = a if type(a) is dict else dict(table_items(a))
+        b_items = b if type(b) is dict else dict(table_items(b))
+        for k in sorted(a_items.keys() | b_items.keys(), key=natural_key):
+            sub = join_path(path, k)
+            if k not in b_items:
+                changes.append(Change(member, sub, "removed", old=a_items[k]))
+            elif k not in a_items:
+                changes.append(Change(member, sub, "added", new=b_items[k]))
+            else:
+                va, vb = a_items[k], b_items[k]
+                if type(va) in TABLE_TYPES and type(vb) in TABLE_TYPES:
+                    if old_hashes[id(va)] != new_hashes[id(vb)]:
+                        visit(va, vb, sub)
+                elif type(va) is not type(vb) or va != vb:
+                    changes.append(Change(member, sub, "changed", old=va, new=vb))
+
+    if type(old) in TABLE_TYPES and type(new) in TABLE_TYPES:
+        if old_hashes[id(old)] != new_hashes[id(new)]:
+            visit(old, new, "")
+    elif type(old) is not type(new) or old != new:
+        changes.append(Change(member, "", "changed", old=old, new=new))
+    return changes
+
+
+@dataclass
+class MissionContent:
+    """Parsed Lua members and CRC-32 of the other members of a mission."""
+    tables: dict[str, Any]
+    crcs: dict[str, int]
+
+    @classmethod
+    def load(cls, source: str, cfg: Config, cache: ParseCache | None = None) -> "MissionContent":
+        """Load a .miz file or the mission/ directory of a development directory."""
+        import os
+        import zipfile
+        from ssf_mission_tools.parse_lua import parse_lua_table_bytes, parse_lua_table_file
+        tables, crcs = {}, {}
+        if os.path.isdir(source):
+            from ssf_mission_tools.build import Build
+            from ssf_mission_tools.shards import assemble_shards
+            if not os.path.isdir(os.path.join(source, "mission")):
+                raise ValueError(f"{source} is not a development directory")
+            for member, path in Build(cfg).collect_sources(source, release=False).items():
+                if member in SORTED_LUA_MEMBERS and os.path.isdir(path):
+                    raw = assemble_shards(path).encode("utf-8")
+                    tables[member] = parse_lua_table_bytes(raw, path, cache)["data"]
+                elif member in SORTED_LUA_MEMBERS:
+                    tables[member] = parse_lua_table_file(path, cache)["data"]
+                else:
+                    crcs[member] = _file_crc(path)
+        elif zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source, "r") as z:
+                for info in z.infolist():
+                    if info.is_dir() or not is_synced_member(info.filename):
+                        continue
+                    if info.filename in SORTED_LUA_MEMBERS:
+                        tables[info.filename] = parse_lua_table_bytes(z.read(info), info.filename, cache)["data"]
+                    else:
+                        crcs[info.filename] = info.CRC
+        else:
+            raise ValueError(f"{source} is neither a .miz file nor a development directory")
+        return cls(tables, crcs)
+
+
+def _file_crc(path: str) -> int:
+    import zlib
+    crc = 0
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def diff_missions(old: MissionContent, new: MissionContent) -> list[Change]:
+    """Return the changes from mission `old` to mission `new`, member by member."""
+    changes: list[Change] = []
+    for member in sorted(old.tables.keys() | new.tables.keys() | old.crcs.keys() | new.crcs.keys()):
+        if member in old.tables and member in new.tables:
+            changes.extend(diff_tables(old.tables[member], new.tables[member], member))
+        elif member in old.crcs and member in new.crcs:
+            if old.crcs[member] != new.crcs[member]:
+                changes.append(Change(member, "", "changed"))
+        elif member in new.tables or member in new.crcs:
+            changes.append(Change(member, "", "added", new=new.tables.get(member)))
+        else:
+            changes.append(Change(member, "", "removed", old=old.tables.get(member)))
+    return changes
+
+
+class Diff:
+
+    @classmethod
+    def add_subparser(cls, parser: ArgumentParser) -> None:
+        parser.add_argument("old", type=str, help="Old mission: a .miz file or a development directory")
+        parser.add_argument("new", type=str, help="New mission: a .miz file or a development directory")
+        parser.add_argument("--member", action="append", help="Only compare this member, e.g. 'mission' (repeatable)")
+        parser.add_argument("--no-cache", action="store_true", help="Parse all Lua files without using the parse cache")
+
+    @classmethod
+    def handle_arguments(cls, args: Any, cfg: Config) -> int:
+        cache = None if args.no_cache else ParseCache.for_config(cfg)
+        try:
+            with phase("load"):
+                old = MissionContent.load(args.old, cfg, cache)
+                new = MissionContent.load(args.new, cfg, cache)
+        except (OSError, ValueError) as e:
+            print(f"Diff failed: {e}")
+            return -1
+        if args.member:
+            for content in (old, new):
+                content.tables = {m: t for m, t in content.tables.items() if m in args.member}
+                content.crcs = {m: c for m, c in content.crcs.items() if m in args.member}
+        with phase("diff"):
+            changes = diff_missions(old, new)
+        for change in changes:
+            print(change.format())
+        # like diff(1): 1 when the missions differ
+        return 1 if changes else 0
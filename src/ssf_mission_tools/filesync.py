@@ -0,0 +1,179 @@
+"""Mirror a directory tree of assets, copying only what changed.
+
+Used for the kneeboard images and the sounds and pictures in I10n/, which
+can add up to hundreds of MB. A destination file is left alone if its size
+and modification time match the source. If only the modification time
+differs, e.g. after the .miz was extracted again, the contents are compared
+and the timestamp is refreshed, so the next sync is a stat call per file.
+Files are written through a temporary file, with a reflink or
+copy_file_range where the filesystem supports it. Destination files that
+no longer exist in the source are deleted.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Iterable
+
+# ioctl(2) request cloning a whole file on btrfs, XFS and other CoW filesystems
+_FICLONE = 0x40049409
+_CHUNK = 1 << 20
+
+
+@dataclass
+class SyncStats:
+    copied: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)
+    bytes_copied: int = 0
+
+    def summary(self) -> str:
+        return (f"{len(self.copied)} copied ({self.bytes_copied / (1024 * 1024):.1f} MB), "
+                f"{self.unchanged} unchanged, {len(self.removed)} removed")
+
+
+def _clone(src_fd: int, dst_fd: int) -> bool:
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _copy_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src_fd, dst_fd, size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        if copied:
+            raise
+        return False
+    return copied == size
+
+
+def copy_file(src: str, dst: str) -> str:
+    """Copy `src` to `dst` with its timestamps, return the method used.
+
+    The data is written to a temporary file that replaces `dst`, so a file
+    sharing its inode with `dst` is never modified.
+    """
+    import shutil
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            if _clone(fsrc.fileno(), fdst.fileno()):
+                method = "reflink"
+            elif _copy_range(fsrc.fileno(), fdst.fileno(), size):
+                method = "copy_file_range"
+            else:
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                shutil.copyfileobj(fsrc, fdst, _CHUNK)
+                method = "copy"
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return method
+
+
+def same_content(a: str, b: str) -> bool:
+    # comparing the bytes reads as much as hashing both files and stops early
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            chunk = fa.read(_CHUNK)
+            if chunk != fb.read(_CHUNK):
+                return False
+            if not chunk:
+                return True
+
+
+def is_unchanged(src: str, src_stat: os.stat_result, dst: str) -> bool:
+    """Whether `dst` holds the same file as `src`; refreshes its timestamps if only they differ."""
+    import shutil
+    try:
+        dst_stat = os.stat(dst)
+    except OSError:
+        return False
+    if dst_stat.st_size != src_stat.st_size:
+        return False
+    if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+        return True
+    if not same_content(src, dst):
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _walk_files(root: str, skip_names: frozenset[str]) -> dict[str, os.DirEntry]:
+    files: dict[str, os.DirEntry] = {}
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        try:
+            entries = list(os.scandir(os.path.join(root, rel)))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.name in skip_names:
+                continue
+            path = f"{rel}/{entry.name}" if rel else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(path)
+            elif entry.is_file():
+                files[path] = entry
+    return files
+
+
+def sync_tree(src: str, dst: str, skip_names: Iterable[str] = (), delete: bool = True) -> SyncStats:
+    """Make `dst` a copy of `src`, touching only files that differ.
+
+    Files and directories named in `skip_names` are neither copied nor
+    deleted. Files in `dst` missing from `src` are deleted if `delete`.
+    """
+    skip = frozenset(skip_names)
+    stats = SyncStats()
+    source = _walk_files(src, skip)
+    for rel, entry in sorted(source.items()):
+        src_path = entry.path
+        dst_path = os.path.join(dst, *rel.split("/"))
+        st = entry.stat()
+        if is_unchanged(src_path, st, dst_path):
+            stats.unchanged += 1
+            continue
+        copy_file(src_path, dst_path)
+        stats.copied.append(rel)
+        stats.bytes_copied += st.st_size
+    if delete:
+        for rel, entry in sorted(_walk_files(dst, skip).items()):
+            if rel not in source:
+                os.remove(entry.path)
+                stats.removed.append(rel)
+                _prune_parents(dst, os.path.dirname(entry.path))
+    return stats
+
+
+def _prune_parents(root: str, directory: str) -> None:
+    # remove directories left empty by deleted files, up to `root`
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
@@ -1,16 +1,65 @@
-from argparse import ArgumentParser
+from __future__ import annotations
+
+from argparse import ArgumentParser, Namespace
 from mimetypes import init
-from typing import Any
+from typing import Any, Iterable
 
+from ssf_mission_tools.cache import ParseCache
 from ssf_mission_tools.config import Config
-from ssf_mission_tools.utils import unzip
-from ssf_mission_tools.common import copy_kneeboard, copy_resources
+from ssf_mission_tools.utils import member_parts, unzip
+from ssf_mission_tools.common import SORTED_LUA_MEMBERS, SYNCED_MEMBER_PATTERNS, copy_kneeboard, copy_resources, is_synced_member
+from ssf_mission_tools.manifest import SyncManifest
+from ssf_mission_tools.timings import TIMINGS, phase
+
+
+def _sort_and_copy_lua_file(src: str | bytes, dst_path: str, cache: ParseCache | None,
+                            trace_memory: bool = False, shard: bool = False) -> tuple[float, float, int | None]:
+    # module level so it can run in a worker process; `src` is a path or the
+    # content of an archive member. With `shard`, the table is written to
+    # shard files instead of `dst_path`. Returns wall time, CPU time and the
+    # tracemalloc peak so the timings of worker processes can be reported.
+    import os
+    import shutil
+    import time
+    from .parse_lua import parse_lua_table_bytes, parse_lua_table_file, sort_and_write
+    from .shards import shards_dir, write_shards
+    if trace_memory:
+        import tracemalloc
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if isinstance(src, bytes):
+        variable, data = parse_lua_table_bytes(src, dst_path, cache).values()
+    else:
+        variable, data = parse_lua_table_file(src, cache).values()
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    if shard:
+        write_shards(variable, data, shards_dir(dst_path))
+        if os.path.isfile(dst_path):
+            os.remove(dst_path)
+    else:
+        sort_and_write(variable, data, dst_path)
+        if os.path.isdir(shards_dir(dst_path)):
+            shutil.rmtree(shards_dir(dst_path))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        if not tracing:
+            tracemalloc.stop()
+    return wall, cpu, peak
 
 
 class Init:
     
-    def __init__(self, cfg: Config) -> None:
+    def __init__(self, cfg: Config, cache: ParseCache | None = None, jobs: int = 1, shard: bool = False) -> None:
         self.cfg = cfg
+        self.cache = cache
+        self.jobs = jobs
+        # store the mission table as shard files, see shards.py
+        self.shard = shard
 
     def check_workdir_does_not_exist(self, workdir: str) -> bool:
         import os
@@ -37,8 +86,9 @@ class Init:
         # clean up build directory if it exists
         if os.path.exists(mission_dst):
             shutil.rmtree(mission_dst)
-        # unzip mission files into build directory
-        unzip(mission_src, mission_dst)
+        # unzip the mission files stored in mission/ into build directory;
+        # DCS writes the kneeboard as KNEEBOARD/IMAGES/..., hence ignore_case
+        unzip(mission_src, mission_dst, include=SYNCED_MEMBER_PATTERNS, jobs=self.jobs, ignore_case=True)
 
     def create_directory_structure(self, workdir: str) -> None:
         import os
@@ -82,36 +132,121 @@ class Init:
         theater_dst = os.path.join(workdir, "mission", "theatre")
         shutil.copy(theater_src, theater_dst)
 
-    def sort_and_copy_special_files(self, workdir: str) -> None:
-        from .parse_lua import parse_lua_table_file, sort_and_write
+    def shards_member(self, member: str) -> bool:
+        return self.shard and member == "mission"
+
+    def sort_and_copy_special_files(self, workdir: str, members: Iterable[str] = SORTED_LUA_MEMBERS) -> dict[str, Exception]:
+        """Parse, sort and write the Lua table members found in build/.
+
+        Files are processed in a process pool with `self.jobs` workers (one
+        per CPU core if 0), falling back to serial processing if no pool can
+        be started. Returns the error raised for each member that failed.
+        """
         import os
-        # special handling for dictionary.lua and mapResource.lua
-        special_files_resources = ["dictionary", "mapResource"]
-        for filename in special_files_resources:
-            src_path = os.path.join(workdir, "build", "I10n", "Default", filename)
+        # special handling for mission, options, warehouses and the
+        # dictionary/mapResource resources
+        tasks = {}
+        for member in members:
+            src_path = os.path.join(workdir, "build", *member.split("/"))
             if os.path.exists(src_path):
-                variable, data = parse_lua_table_file(src_path).values()
-                dst_path = os.path.join(workdir, "mission", "I10n", "Default", filename)
-                sort_and_write(variable, data, dst_path)
-        special_files = ["mission", "options", "warehouses"]
-        for filename in special_files:
-            src_path = os.path.join(workdir, "build", filename)
-            if os.path.exists(src_path):
-                variable, data = parse_lua_table_file(src_path).values()
-                dst_path = os.path.join(workdir, "mission", filename)
-                sort_and_write(variable, data, dst_path)
+                tasks[member] = (src_path, os.path.join(workdir, "mission", *member.split("/")))
+        return self.sort_and_write_lua_files(tasks)
+
+    def sort_and_write_lua_files(self, tasks: dict[str, tuple[str | bytes, str]]) -> dict[str, Exception]:
+        import os
+        # largest files first so the pool finishes close to the time of the biggest one
+        def size(src: str | bytes) -> int:
+            return len(src) if isinstance(src, bytes) else os.path.getsize(src)
+        tasks = dict(sorted(tasks.items(), key=lambda kv: size(kv[1][0]), reverse=True))
+        errors: dict[str, Exception] = {}
+        workers = min(self.jobs or os.cpu_count() or 1, len(tasks))
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {m: pool.submit(_sort_and_copy_lua_file, src, dst, self.cache, TIMINGS.trace_memory,
+                                              self.shards_member(m))
+                               for m, (src, dst) in tasks.items()}
+                    for member, future in futures.items():
+                        try:
+                            TIMINGS.record(member, *future.result())
+                        except BrokenProcessPool:
+                            raise
+                        except Exception as e:
+                            errors[member] = e
+                return errors
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                print(f"Could not use a process pool ({e}), sorting serially")
+                errors.clear()
+        for member, (src, dst) in tasks.items():
+            try:
+                with phase(member):
+                    _sort_and_copy_lua_file(src, dst, self.cache, shard=self.shards_member(member))
+            except Exception as e:
+                errors[member] = e
+        return errors
+
+    def sync_from_archive(self, mission_name: str, workdir: str, members: Iterable[str] | None = None) -> dict[str, Exception]:
+        """Copy and sort members of the .miz straight into mission/.
+
+        The archive is opened once; plain members are streamed to their
+        destination and Lua tables are parsed from memory, so nothing is
+        written to build/. Only `members` are synced if given. Returns the
+        error raised for each Lua member that failed.
+        """
+        import os
+        import shutil
+        import zipfile
+        from pathlib import Path
+        mission_src = os.path.join(self.cfg.mission_dir, mission_name)
+        mission_dst = Path(workdir) / "mission"
+        wanted = set(members) if members is not None else None
+        tasks: dict[str, tuple[str | bytes, str]] = {}
+        with zipfile.ZipFile(mission_src, "r") as z:
+            for info in z.infolist():
+                member = info.filename
+                if info.is_dir() or not is_synced_member(member) or (wanted is not None and member not in wanted):
+                    continue
+                dst_path = mission_dst.joinpath(*member_parts(member))
+                if member in SORTED_LUA_MEMBERS:
+                    tasks[member] = (z.read(info), str(dst_path))
+                    continue
+                dst_path.parent.mkdir(parents=True, exist_ok=True)
+                with z.open(info) as src, open(dst_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+        return self.sort_and_write_lua_files(tasks)
 
     @classmethod
     def add_subparser(cls, parser: ArgumentParser) -> None:
-        parser.add_argument("-d", "--directory", type=str, default=".", help="Target directory for initialization")
-        parser.add_argument("-m", "--mission", type=str, required=True, help="Mission used for initialization")
+        parser.add_argument("-d", "--directory", type=str, default=".", help="Target directory for initialization (parent directory for several missions)")
+        parser.add_argument("-m", "--mission", type=str, nargs="+", required=True,
+                            help="Missions used for initialization: file names, glob patterns or MISSION=DIRECTORY")
+        parser.add_argument("--no-cache", action="store_true", help="Parse all Lua files without using the parse cache")
+        parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="Worker processes for sorting Lua files, or for missions with several missions (0: one per CPU core, 1: serial)")
+        parser.add_argument("--in-memory", action="store_true", help="Process the mission straight from the .miz without extracting it to build/")
+        parser.add_argument("--shard", action="store_true", help="Store the mission table as shard files in mission/mission.shards")
 
     @classmethod
     def handle_arguments(cls, args: Any, cfg: Config) -> None:
+        jobs = args.jobs if args.jobs is not None else cfg.jobs
+        if isinstance(args.mission, list):
+            from ssf_mission_tools.batch import expand_missions, run_batch_command
+            targets = expand_missions(args.mission, cfg.mission_dir, args.directory)
+            if not targets:
+                print(f"No mission matches {' '.join(args.mission)} in {cfg.mission_dir}")
+                return -1
+            if len(targets) > 1:
+                # one mission per worker, each sorted serially
+                runs = [Namespace(**{**vars(args), "mission": m, "directory": d, "jobs": 1}) for m, d in targets]
+                return run_batch_command(Init, runs, cfg, jobs)
+            args = Namespace(**{**vars(args), "mission": targets[0][0], "directory": targets[0][1]})
         workdir = args.directory
-        mission_name =args.mission
+        mission_name = args.mission
         print(f"Initializing development directory at {workdir} for mission {mission_name}")
-        init = Init(cfg)
+        cache = None if args.no_cache else ParseCache.for_config(cfg)
+        init = Init(cfg, cache, jobs, args.shard)
         if not init.check_mission_exists(mission_name):
             print(f"Mission {mission_name} does not exist in {cfg.mission_dir}")
             return -1
@@ -124,17 +259,40 @@ class Init:
             return -1
         # Preconditions satisfied, proceed with initialization
         # create mission-config, copy mission files
-        init.init_git_repo(workdir)
-        init.create_directory_structure(workdir)
-        print("Unpacking mission files...")
-        init.unpack_mission_files(mission_name, workdir)
-        print("Copying theater...")
-        init.copy_theater(workdir)
-        print("Copying resource files...")
-        copy_resources(workdir)
-        print("Copying kneeboard files...")
-        copy_kneeboard(workdir)
-        print("Sorting and copying special Lua files...")
-        init.sort_and_copy_special_files(workdir)
+        with phase("git"):
+            init.init_git_repo(workdir)
+        with phase("structure"):
+            init.create_directory_structure(workdir)
+        if args.in_memory:
+            print("Copying and sorting mission files from the archive...")
+            with phase("sync"):
+                errors = init.sync_from_archive(mission_name, workdir)
+        else:
+            print("Unpacking mission files...")
+            with phase("unpack"):
+                init.unpack_mission_files(mission_name, workdir)
+            print("Copying theater...")
+            with phase("theater"):
+                init.copy_theater(workdir)
+            print("Copying resource files...")
+            with phase("resources"):
+                stats = copy_resources(workdir)
+            if stats is not None:
+                print(f"  {stats.summary()}")
+            print("Copying kneeboard files...")
+            with phase("kneeboard"):
+                stats = copy_kneeboard(workdir)
+            if stats is not None:
+                print(f"  {stats.summary()}")
+            print("Sorting and copying special Lua files...")
+            with phase("sort"):
+                errors = init.sort_and_copy_special_files(workdir)
+        for member, error in errors.items():
+            print(f"Failed to sort {member}: {error}")
+        if errors:
+            return -1
+        import os
+        with phase("manifest"):
+            SyncManifest.from_archive(mission_name, os.path.join(cfg.mission_dir, mission_name)).save(workdir)
         print(f"Development directory {workdir} initialized successfully.")
         return 0
\ No newline at end of file
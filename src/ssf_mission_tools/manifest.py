@@ -0,0 +1,52 @@
+"""Sync manifest of the .miz a development directory was last synced from.
+
+The manifest stores the CRC-32 and size of every archive member, as listed
+in the zip central directory, in `configs/sync-manifest.json`. Comparing it
+with the current archive tells which members need to be synced again.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from ssf_mission_tools.utils import zip_member_crcs
+
+
+@dataclass
+class SyncManifest:
+    mission: str
+    members: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    @staticmethod
+    def path(workdir: str | Path) -> Path:
+        return Path(workdir) / "configs" / "sync-manifest.json"
+
+    @classmethod
+    def from_archive(cls, mission: str, zip_path: str | Path) -> "SyncManifest":
+        members = {name: {"crc": crc, "size": size} for name, (crc, size) in zip_member_crcs(zip_path).items()}
+        return cls(mission, members)
+
+    @classmethod
+    def load(cls, workdir: str | Path) -> "SyncManifest | None":
+        p = cls.path(workdir)
+        if not p.exists():
+            return None
+        try:
+            with p.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return cls(data["mission"], data.get("members", {}))
+        except Exception:
+            return None
+
+    def save(self, workdir: str | Path) -> None:
+        p = self.path(workdir)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with p.open("w", encoding="utf-8") as fh:
+            json.dump(asdict(self), fh, indent=2, sort_keys=True, ensure_ascii=False)
+
+    def diff(self, other: "SyncManifest") -> tuple[list[str], list[str]]:
+        """Return members that are new or changed in `other` and members removed from it."""
+        changed = [name for name, entry in other.members.items() if self.members.get(name) != entry]
+        removed = [name for name in self.members if name not in other.members]
+        return sorted(changed), sorted(removed)
@@ -0,0 +1,142 @@
+"""Strip comments and whitespace from Lua scripts for release builds.
+
+The minifier works on tokens: strings and long strings are kept byte for
+byte, comments are dropped, indentation and blank lines are removed and the
+whitespace between two tokens is dropped unless the tokens would merge.
+Line breaks between statements are kept, since a Lua 5.1 chunk can depend
+on them (`f\n(g)()` is an error, `f(g)()` a call).
+
+Minified scripts are cached on disk by the hash of their source, so an
+unchanged MOOSE is processed once and loaded from the cache afterwards.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.common import user_cache_dir
+
+# bump whenever the output of minify_lua changes
+_MINIFY_VERSION = b"ssf-minify-1"
+
+# strings and comments; everything between them is code
+_PROTECTED = re.compile(
+    rb"""--\[(?P<ceq>=*)\[.*?\](?P=ceq)\]|--[^\n]*"""
+    rb"""|\[(?P<seq>=*)\[.*?\](?P=seq)\]|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'""",
+    re.DOTALL)
+_LINE_BREAKS = re.compile(rb"[ \t\r\f\v]*\n[\s]*")
+_BLANKS = re.compile(rb"[ \t\r\f\v]+")
+# a single space between code characters that is not needed because the
+# characters on both sides would not merge into another token. \x00 stands
+# for a long string, which starts with `[`, \x01 for a quoted string. The
+# pattern starts with the space so the scan for it is fast.
+_REDUNDANT_SPACE = re.compile(
+    rb" (?:(?<=[A-Za-z_] )(?=[^\w])|(?<=\d )(?=[^\w.])"
+    rb"|(?<=[^\w.] )(?=\w)|(?<=\. )(?=[A-Za-z_])"
+    rb"|(?<=[^\w\-.\[=<>~] )(?=[^\w])|(?<=- )(?=[^\w\-])|(?<=\. )(?=[^\w.])"
+    rb"|(?<=\[ )(?=[^\w\[=\x00])|(?<=[=<>~] )(?=[^\w=]))")
+_PLACEHOLDERS = re.compile(rb"[\x00\x01]")
+
+
+def minify_lua(source: bytes) -> bytes:
+    """Return `source` without comments and redundant whitespace."""
+    if _PLACEHOLDERS.search(source):
+        # the placeholders below would be ambiguous
+        return source
+    strings: list[bytes] = []
+    code: list[bytes] = []
+    pos = 0
+    for m in _PROTECTED.finditer(source):
+        code.append(source[pos:m.start()])
+        text = m.group()
+        if text.startswith(b"--"):
+            # comments separate tokens like whitespace
+            code.append(b"\n" if b"\n" in text else b" ")
+        else:
+            code.append(b"\x00" if text.startswith(b"[") else b"\x01")
+            strings.append(text)
+        pos = m.end()
+    code.append(source[pos:])
+    text = _LINE_BREAKS.sub(b"\n", b"".join(code))
+    text = _REDUNDANT_SPACE.sub(b"", _BLANKS.sub(b" ", text)).strip()
+    if not text:
+        return b""
+    parts = _PLACEHOLDERS.split(text)
+    out = [parts[0]]
+    for string, part in zip(strings, parts[1:]):
+        out.append(string)
+        out.append(part)
+    out.append(b"\n")
+    return b"".join(out)
+
+
+def bundle_lua(scripts: Iterable[tuple[str, bytes]]) -> bytes:
+    """Concatenate scripts into one chunk, each in a function of its own.
+
+    A script keeps its locals to itself, and a top-level `return` only ends
+    that script, as it would in its own `DO SCRIPT FILE`. The `;` after each
+    call keeps the next `(function` from being read as a call of its result.
+    """
+    parts = []
+    for name, data in scripts:
+        if not data.endswith(b"\n"):
+            data += b"\n"
+        parts.append(b"-- " + name.encode("utf-8") + b"\n(function(...)\n" + data + b"end)(...);\n")
+    return b"".join(parts)
+
+
+@dataclass
+class MinifyStats:
+    scripts: int = 0
+    cached: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+    seconds_saved: float = 0.0
+
+    def summary(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        percent = 100 * saved / self.bytes_in if self.bytes_in else 0
+        return (f"Minified {self.scripts} script(s), {self.cached} from cache: "
+                f"{self.bytes_in / 1024:.0f} KB -> {self.bytes_out / 1024:.0f} KB "
+                f"({saved / 1024:.0f} KB, {percent:.0f}% smaller) in {self.seconds:.2f}s, "
+                f"{self.seconds_saved:.2f}s saved by the cache")
+
+
+class ScriptMinifier:
+    """Minify scripts through an on-disk cache keyed by the hash of the source."""
+
+    def __init__(self, cache: ParseCache | None = None) -> None:
+        self.cache = cache
+        self.stats = MinifyStats()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def with_default_cache(cls, max_bytes: int) -> ScriptMinifier:
+        return cls(ParseCache(user_cache_dir("ssf-mission-tools") / "minified", max_bytes=max_bytes))
+
+    def minify(self, source: bytes) -> bytes:
+        start = time.perf_counter()
+        key = ParseCache.key(_MINIFY_VERSION + source) if self.cache is not None else None
+        cached = self.cache.get(key) if key is not None else None
+        if cached is not None:
+            data, original_seconds = cached
+        else:
+            data = minify_lua(source)
+            original_seconds = time.perf_counter() - start
+            if key is not None:
+                self.cache.put(key, (data, original_seconds))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats.scripts += 1
+            self.stats.bytes_in += len(source)
+            self.stats.bytes_out += len(data)
+            self.stats.seconds += elapsed
+            if cached is not None:
+                self.stats.cached += 1
+                self.stats.seconds_saved += max(original_seconds - elapsed, 0.0)
+        return data
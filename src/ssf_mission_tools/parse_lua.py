@@ -2,87 +2,557 @@
 
 This module provides a best-effort extractor that locates a top-level table
 assignment (for example `mission = { ... }` or a trailing `return { ... }`) and
-decodes it into Python using `slpp`.
+decodes it into Python with a single-pass tokenizer for the DCS table dialect.
+The decoded structures compare equal to the ones `slpp` produces; to keep
+large missions compact, keys are interned and tables keyed 1..n are stored
+as `LuaArray`.
+
+In lazy mode, the file is only indexed: the offsets of the top-level and
+second-level subtables are recorded and a subtable is decoded when it is
+first accessed through the returned `LazyTable`.
 """
 from __future__ import annotations
 
 import re
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from sys import intern
+from typing import IO, TYPE_CHECKING, Any, Iterator, NamedTuple
 
-from slpp import slpp as lua
+if TYPE_CHECKING:
+    from .cache import ParseCache
 
 
-_TABLE_RE_RETURN = re.compile(r"return\s+({.*})\s*$", re.S)
-_TABLE_RE_ASSIGN = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*=\s*({.*})", re.S)
+_TABLE_RE_RETURN = re.compile(r"return\s+({)", re.S)
+_TABLE_RE_ASSIGN = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*=\s*({)", re.S)
 
+# whitespace, `-- end of [...]` line comments and `--[[ ]]` block comments
+_WS = r"\s*(?:--(?:\[\[.*?\]\]|[^\n]*)\s*)*"
+_DQ = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
+_SQ = r"'([^'\\]*(?:\\.[^'\\]*)*)'"
+_NUM = r"(-?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?))"
 
-def _find_table_literal(text: str) -> str | None:
-    # Try trailing return { ... }
-    m = _TABLE_RE_RETURN.search(text)
-    if m:
-        return m.group(1)
-    # Note: assignment pattern is handled in the main parser to capture the
-    # variable name. Here we only look for a trailing `return { ... }` and
-    # fallback to a naive brace block search.
-    # Last resort: find the first large brace block (naive)
-    m = re.search(r"({\s*\n.*\n})", text, re.S)
-    if m:
-        return m.group(1)
-    return None
+# One match per table entry: optional `[key] =` / `name =`, then either a
+# value (opening brace, string, number or word) or a closing brace, followed
+# by an optional separator.
+_ENTRY_RE = re.compile(
+    _WS
+    + r"(?:(\})"
+    + r"|(?:(?:\[\s*(?:" + _DQ + r"|" + _SQ + r"|" + _NUM + r")\s*\]"
+    + r"|([A-Za-z_]\w*))" + _WS + r"=)?" + _WS
+    + r"(?:(\{)|" + _DQ + r"|" + _SQ + r"|\[\[(.*?)\]\]|" + _NUM + r"|([A-Za-z_]\w*))"
+    + r")" + _WS + r"[,;]?",
+    re.S,
+)
 
+# strings, comments and braces, to find the end of a table without decoding it
+_SKIP_RE = re.compile(
+    r"""[{}]|"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*'"""
+    r"""|--(?:\[(=*)\[.*?\]\1\]|[^\n]*)|\[(=*)\[.*?\]\2\]""",
+    re.S,
+)
 
-def parse_lua_table_file(path: str | Path) -> Any:
-    p = Path(path)
-    txt = p.read_text(encoding="utf-8", errors="ignore")
+_ENTRY_SEP_RE = re.compile(_WS + r"[,;]?", re.S)
+
+# bump whenever the structure of TableIndex changes
+_INDEX_VERSION = b"ssf-table-index-1"
+
+_WRITE_BUFFER_SIZE = 1 << 16
+
+_WORDS = {"true": True, "false": False, "nil": None}
+_ESCAPE_RE = re.compile(r"\\(.)", re.S)
+
+
+def _unescape(s: str, quote: str) -> str:
+    # slpp only unescapes the quote character, every other escape is kept raw
+    if "\\" not in s:
+        return s
+    return _ESCAPE_RE.sub(lambda m: m.group(1) if m.group(1) == quote else m.group(0), s)
+
+
+def _number(s: str) -> int | float:
+    if "." in s or "e" in s or "E" in s:
+        if s[:2] not in ("0x", "0X", "-0x", "-0X"):
+            return float(s)
+    try:
+        return int(s, 0)
+    except ValueError:
+        return float(s)
+
+
+class LuaArray(Mapping):
+    """A Lua table with the keys 1..n, stored as the list of its values.
+
+    Compares equal to the `{1: v1, ..., n: vn}` dict slpp decodes such tables
+    to, needs no key objects or hash table, and is always in canonical order.
+    Values can be replaced and appended, other keys raise `KeyError`.
+    """
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Any = ()) -> None:
+        self._values = list(values)
+
+    def __getitem__(self, key: Any) -> Any:
+        if type(key) is int and 0 < key <= len(self._values):
+            return self._values[key - 1]
+        raise KeyError(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        n = len(self._values)
+        if type(key) is int and 0 < key <= n:
+            self._values[key - 1] = value
+        elif type(key) is int and key == n + 1:
+            self._values.append(value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return type(key) is int and 0 < key <= len(self._values)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, len(self._values) + 1))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LuaArray):
+            return self._values == other._values
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self) -> str:
+        return f"LuaArray({self._values!r})"
+
+
+class LuaComment(str):
+    """A table value that is written as a `-- comment` line instead of an entry.
+
+    Used to leave markers in a table written without some of its subtables.
+    """
+    __slots__ = ()
+
+
+def _finish_table(o: dict) -> dict | list | LuaArray:
+    # tables keyed 0..n-1 (positional entries) decode to lists, like slpp;
+    # tables keyed 1..n (DCS arrays) are stored without their keys
+    if o and all(type(k) is int for k in o):
+        lo, hi, n = min(o), max(o), len(o)
+        if lo == 0 and hi == n - 1:
+            return [o[i] for i in range(n)]
+        if lo == 1 and hi == n:
+            return LuaArray([o[i] for i in range(1, n + 1)])
+    return o
+
+
+def decode_lua_table(text: str, pos: int = 0) -> Any:
+    """Decode the Lua table literal starting at the `{` at `text[pos]`.
+
+    Anything after the closing brace of the table is ignored.
+    """
+    if text[pos:pos + 1] != "{":
+        raise ValueError(f"Expected '{{' at offset {pos}")
+    match = _ENTRY_RE.match
+    stack: list[tuple[dict, Any, int]] = []
+    cur: dict = {}
+    idx = 0
+    pos += 1
+    while True:
+        m = match(text, pos)
+        if m is None:
+            if pos >= len(text.rstrip()):
+                raise ValueError("Unexpected end of table while parsing Lua table")
+            raise ValueError(f"Unexpected input at offset {pos}: {text[pos:pos + 40]!r}")
+        pos = m.end()
+        close, kdq, ksq, knum, kname, opn, vdq, vsq, vlong, vnum, vword = m.groups()
+        if close is not None:
+            value = _finish_table(cur)
+            if not stack:
+                return value
+            cur, key, idx = stack.pop()
+            cur[key] = value
+            idx += 1
+            continue
+        if kdq is not None:
+            key = intern(_unescape(kdq, '"'))
+        elif knum is not None:
+            key = _number(knum)
+        elif kname is not None:
+            key = intern(kname)
+        elif ksq is not None:
+            key = intern(_unescape(ksq, "'"))
+        else:
+            key = idx
+        if opn is not None:
+            stack.append((cur, key, idx))
+            cur = {}
+            idx = 0
+            continue
+        if vdq is not None:
+            value = _unescape(vdq, '"')
+        elif vnum is not None:
+            value = _number(vnum)
+        elif vword is not None:
+            value = _WORDS.get(vword, vword)
+        elif vsq is not None:
+            value = _unescape(vsq, "'")
+        else:
+            value = vlong
+        cur[key] = value
+        idx += 1
+
+
+class TableIndex(NamedTuple):
+    """Offset of a table's `{` in the text, with its entries if it was indexed.
+
+    `entries` maps the keys of the table to their scalar values or to the
+    `TableIndex` of their subtables; it is None for tables that were only
+    located, not indexed.
+    """
+    start: int
+    entries: dict | None = None
+
+
+def _skip_table(text: str, pos: int) -> int:
+    """Offset just after the `}` closing the table that opens at `text[pos]`."""
+    depth = 0
+    for m in _SKIP_RE.finditer(text, pos):
+        c = m.group()
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    raise ValueError("Unexpected end of table while indexing Lua table")
+
+
+def _find_table_end(text: str, pos: int, key: Any, depth: int) -> int:
+    # Tables in the layout of the DCS editor open with `{` on a line of
+    # their own and close with `}, -- end of [key]` at the same indentation.
+    # Inside strings, DCS escapes every line break with a backslash and
+    # every quote, so a trailer line is never part of one.
+    indent = "\t" * depth
+    if pos > depth and text.startswith("\n" + indent + "{", pos - depth - 1):
+        trailer = f"\n{indent}}}, -- end of {_lua_key(key)}\n"
+        end = text.find(trailer, pos)
+        while end > 0 and text[end - 1] == "\\":
+            end = text.find(trailer, end + 1)
+        if end > 0 and text.count("{", pos, end) == text.count("}", pos, end) + 1:
+            return end + len(indent) + 2
+    # any other layout: scan the strings, comments and braces
+    return _skip_table(text, pos)
+
+
+def index_lua_table(text: str, pos: int = 0, depth: int = 2) -> TableIndex:
+    """Index the Lua table literal starting at the `{` at `text[pos]`.
+
+    The entries of the table and of its subtables down to `depth` levels are
+    recorded, deeper subtables are only located. Scalars are decoded like
+    `decode_lua_table` does.
+    """
+    if text[pos:pos + 1] != "{":
+        raise ValueError(f"Expected '{{' at offset {pos}")
+
+    def visit(pos: int, level: int) -> tuple[TableIndex, int]:
+        match = _ENTRY_RE.match
+        entries: dict = {}
+        start = pos
+        idx = 0
+        pos += 1
+        while True:
+            m = match(text, pos)
+            if m is None:
+                if pos >= len(text.rstrip()):
+                    raise ValueError("Unexpected end of table while indexing Lua table")
+                raise ValueError(f"Unexpected input at offset {pos}: {text[pos:pos + 40]!r}")
+            pos = m.end()
+            close, kdq, ksq, knum, kname, opn, vdq, vsq, vlong, vnum, vword = m.groups()
+            if close is not None:
+                return TableIndex(start, entries), pos
+            if kdq is not None:
+                key = intern(_unescape(kdq, '"'))
+            elif knum is not None:
+                key = _number(knum)
+            elif kname is not None:
+                key = intern(kname)
+            elif ksq is not None:
+                key = intern(_unescape(ksq, "'"))
+            else:
+                key = idx
+            if opn is not None:
+                if level < depth:
+                    entries[key], pos = visit(m.start(6), level + 1)
+                else:
+                    entries[key] = TableIndex(m.start(6))
+                    pos = _find_table_end(text, m.start(6), key, level + 1)
+                    # the separator after the closing brace
+                    pos = _ENTRY_SEP_RE.match(text, pos).end()
+            elif vdq is not None:
+                entries[key] = _unescape(vdq, '"')
+            elif vnum is not None:
+                entries[key] = _number(vnum)
+            elif vword is not None:
+                entries[key] = _WORDS.get(vword, vword)
+            elif vsq is not None:
+                entries[key] = _unescape(vsq, "'")
+            else:
+                entries[key] = vlong
+            idx += 1
+
+    return visit(pos, 0)[0]
+
+
+class LazyTable(Mapping):
+    """Read-only view of an indexed Lua table, see `index_lua_table`.
+
+    Subtables are decoded from the text when they are first accessed, and
+    kept. The keys are those of the Lua table, so a table keyed 0..n-1 is
+    not turned into a list; `load()` decodes the whole table exactly like
+    `decode_lua_table`.
+    """
+    __slots__ = ("_text", "_index", "_values")
+
+    def __init__(self, text: str, index: TableIndex) -> None:
+        self._text = text
+        self._index = index
+        self._values: dict = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        values = self._values
+        if key in values:
+            return values[key]
+        value = self._index.entries[key]
+        if type(value) is TableIndex:
+            if value.entries is not None:
+                value = LazyTable(self._text, value)
+            else:
+                value = decode_lua_table(self._text, value.start)
+            values[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._index.entries)
+
+    def __len__(self) -> int:
+        return len(self._index.entries)
+
+    def load(self) -> Any:
+        """Decode the whole table."""
+        return decode_lua_table(self._text, self._index.start)
+
+    def __repr__(self) -> str:
+        return f"LazyTable({len(self)} entries)"
+
+
+def _find_table(txt: str, source: str | Path) -> tuple[str | None, int]:
     # detect assignment with variable name first; capture both the name and the table
     m = _TABLE_RE_ASSIGN.search(txt)
     if m:
-        varname = m.group(1)
-        tbl = m.group(2)
-        data = lua.decode(tbl)
-        return {"variable": varname, "data": data}
-
-    tbl = _find_table_literal(txt)
-    if not tbl:
-        raise ValueError(f"No top-level table literal found in {p}")
-    # slpp expects a Lua table expression; decode to Python
-    data = lua.decode(tbl)
-    return {"variable": None, "data": data}
+        return m.group(1), m.start(2)
+
+    # Try trailing return { ... }
+    m = _TABLE_RE_RETURN.search(txt)
+    if m is None:
+        # Last resort: find the first large brace block (naive)
+        m = re.search(r"({)\s*\n", txt)
+    if m is None:
+        raise ValueError(f"No top-level table literal found in {source}")
+    return None, m.start(1)
+
+
+def parse_lua_table_text(txt: str, source: str | Path = "<string>", lazy: bool = False) -> Any:
+    variable, pos = _find_table(txt, source)
+    if lazy:
+        return {"variable": variable, "data": LazyTable(txt, index_lua_table(txt, pos))}
+    return {"variable": variable, "data": decode_lua_table(txt, pos)}
 
-def sort_and_write(variable: str | None, data: Any, path: str | Path) -> None:
-    """Sort a Lua table and write it back to file.
 
-    This function sorts dictionary keys by a natural-order key derived from
-    the string representation of each key (so numeric substrings sort
-    numerically: "1","2","10" -> 1,2,10). Works with mixed string/number keys.
+def _decode(raw: bytes) -> str:
+    txt = raw.decode("utf-8", errors="ignore")
+    if "\r" in txt:
+        # universal newlines, as Path.read_text would do
+        txt = txt.replace("\r\n", "\n").replace("\r", "\n")
+    return txt
+
+
+def parse_lua_table_bytes(raw: bytes, source: str | Path = "<bytes>", cache: ParseCache | None = None,
+                          lazy: bool = False) -> Any:
+    """Parse the content of a Lua table file into `{"variable": name, "data": table}`.
+
+    With a `cache`, results are looked up by the hash of the content and
+    unchanged files are not parsed again. With `lazy`, the table is only
+    indexed and `data` is a `LazyTable`; the cache then holds the index.
     """
-    def natural_key(k: Any):
-        s = str(k)
-        parts = re.split(r'(\d+)', s)
-        key_parts = []
-        for part in parts:
-            if not part:
-                continue
-            if part.isdigit():
-                key_parts.append((0, int(part)))
-            else:
-                key_parts.append((1, part.lower()))
-        return tuple(key_parts)
-
-    def sort_table(obj: Any) -> Any:
-        if isinstance(obj, dict):
-            items = sorted(obj.items(), key=lambda kv: natural_key(kv[0]))
-            return {k: sort_table(v) for k, v in items}
-        elif isinstance(obj, list):
-            return [sort_table(item) for item in obj]
+    if lazy:
+        return _parse_lazy(raw, source, cache)
+    key = None
+    if cache is not None:
+        key = cache.key(raw)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    result = parse_lua_table_text(_decode(raw), source)
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def _parse_lazy(raw: bytes, source: str | Path, cache: ParseCache | None) -> Any:
+    txt = _decode(raw)
+    if cache is None:
+        return parse_lua_table_text(txt, source, lazy=True)
+    key = cache.key(_INDEX_VERSION + raw)
+    hit = cache.get(key)
+    if hit is None:
+        variable, pos = _find_table(txt, source)
+        hit = (variable, index_lua_table(txt, pos))
+        cache.put(key, hit)
+    variable, index = hit
+    return {"variable": variable, "data": LazyTable(txt, index)}
+
+
+def parse_lua_table_file(path: str | Path, cache: ParseCache | None = None, lazy: bool = False) -> Any:
+    p = Path(path)
+    if cache is None:
+        # without a cache the raw bytes are not needed next to the text
+        return parse_lua_table_text(p.read_text(encoding="utf-8", errors="ignore"), p, lazy)
+    return parse_lua_table_bytes(p.read_bytes(), p, cache, lazy)
+
+_NATURAL_RE = re.compile(r"(\d+)")
+
+
+# mission tables repeat a small set of keys many times
+@lru_cache(maxsize=1 << 16, typed=True)
+def natural_key(k: Any) -> tuple:
+    """Natural-order sort key derived from the string representation of `k`.
+
+    Numeric substrings sort numerically ("1","2","10" -> 1,2,10), the rest
+    case-insensitively, so mixed string/number keys compare consistently.
+    """
+    key_parts = []
+    for part in _NATURAL_RE.split(str(k)):
+        if not part:
+            continue
+        if part.isdigit():
+            key_parts.append((0, int(part)))
         else:
-            return obj
+            key_parts.append((1, part.lower()))
+    return tuple(key_parts)
 
-    sorted_data = sort_table(data)
-    lua_table_str = lua.encode(sorted_data)
-    with open(path, "w", encoding="utf-8") as f:
-        if variable:
-            f.write(f"{variable} = {lua_table_str}\n")
+
+@lru_cache(maxsize=1 << 16, typed=True)
+def _lua_key(k: Any) -> str:
+    if isinstance(k, str):
+        return '["%s"]' % k.replace('"', '\\"')
+    if isinstance(k, bool):
+        return "[%s]" % str(k).lower()
+    return "[%s]" % k
+
+
+def _lua_scalar(v: Any) -> str:
+    if isinstance(v, str):
+        return '"%s"' % v.replace('"', '\\"')
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if v is None:
+        return "nil"
+    return str(v)
+
+
+# types of parsed tables; test with `type(v) in TABLE_TYPES`, isinstance()
+# against the LuaArray ABC is slow for scalars
+TABLE_TYPES = frozenset((dict, list, LuaArray))
+
+
+def sort_table(data: Any) -> Any:
+    """Put every table in `data` in canonical key order, in place.
+
+    Keys are ordered with `natural_key`. Tables that are already in order,
+    lists and `LuaArray`s are left untouched, the others are reordered
+    without copying their values. Returns `data`.
+    """
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if type(obj) is dict:
+            if len(obj) > 1:
+                keys = list(map(natural_key, obj))
+                if keys != sorted(keys):
+                    # move the entries to the end in order, the values stay put
+                    for k in sorted(obj, key=natural_key):
+                        obj[k] = obj.pop(k)
+            values = obj.values()
+        elif type(obj) is LuaArray:
+            values = obj._values
+        else:
+            values = obj
+        stack.extend(v for v in values if type(v) in TABLE_TYPES)
+    return data
+
+
+def table_items(obj: Any):
+    """Iterate the `(key, value)` entries of a parsed table with their Lua keys."""
+    if type(obj) is list:
+        # positional entries are 1-based in Lua
+        return enumerate(obj, 1)
+    if type(obj) is LuaArray:
+        return enumerate(obj._values, 1)
+    return obj.items()
+
+
+def _write_table_body(write, obj: Any, depth: int) -> None:
+    indent = "\t" * depth
+    for k, v in table_items(obj):
+        key = _lua_key(k)
+        if type(v) in TABLE_TYPES:
+            if v:
+                write(f"{indent}{key} = \n{indent}{{\n")
+                _write_table_body(write, v, depth + 1)
+                write(f"{indent}}}, -- end of {key}\n")
+            else:
+                write(f"{indent}{key} = {{}},\n")
+        elif type(v) is float or type(v) is int:
+            write(f"{indent}{key} = {v},\n")
+        elif type(v) is LuaComment:
+            write(f"{indent}-- {v}\n")
         else:
-            f.write(f"{lua_table_str}\n")
\ No newline at end of file
+            write(f"{indent}{key} = {_lua_scalar(v)},\n")
+
+
+def write_lua_entries(fh: IO[str], table: Any, depth: int) -> None:
+    """Stream the entries of `table` as they appear at `depth` in a table file.
+
+    Entries are written in their current order, see `sort_table`.
+    """
+    _write_table_body(fh.write, table, depth)
+
+
+def write_lua_table(fh: IO[str], variable: str | None, data: Any) -> None:
+    """Stream `data` to `fh` in canonical key order using the DCS editor layout.
+
+    `data` is sorted in place with `sort_table`, then written with tab
+    indentation and `-- end of [...]` trailers, one entry per line, without
+    building a sorted copy or the whole text.
+    """
+    sort_table(data)
+    write = fh.write
+    if variable:
+        write(f"{variable} = \n{{\n")
+    else:
+        write("{\n")
+    _write_table_body(write, data, 1)
+    if variable:
+        write(f"}} -- end of {variable}\n")
+    else:
+        write("}\n")
+
+
+def sort_and_write(variable: str | None, data: Any, path: str | Path) -> None:
+    """Sort a Lua table in place and write it back to file.
+
+    Keys are ordered with `natural_key` and the table is streamed straight
+    into a buffered file handle in the layout the DCS mission editor uses.
+    """
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=_WRITE_BUFFER_SIZE) as f:
+        write_lua_table(f, variable, data)
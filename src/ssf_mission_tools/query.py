@@ -0,0 +1,275 @@
+"""Query the units, groups, triggers and dictionary keys of a mission.
+
+`ssf-tools query` answers questions like "all units of type X in coalition
+blue", "which group has unitId 1234" or "which triggers reference
+DictKey_57" from an index of the mission: one record per unit, group,
+trigger and key, and for every filter a map from the filter value to the
+records that have it, so a lookup does not walk the mission tree.
+
+The index is stored in the parse cache under the hash of the mission,
+dictionary and map resource, so it is built once per version of the mission
+and loaded in milliseconds afterwards. Results are printed as JSON.
+"""
+from __future__ import annotations
+
+import re
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from typing import Any
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.parse_lua import TABLE_TYPES, natural_key, table_items
+from ssf_mission_tools.timings import phase
+
+# bump whenever the records or filters change
+_QUERY_INDEX_VERSION = b"ssf-query-index-1"
+
+DICTIONARY_MEMBER = "I10n/Default/dictionary"
+MAP_RESOURCE_MEMBER = "I10n/Default/mapResource"
+INDEXED_MEMBERS = ("mission", DICTIONARY_MEMBER, MAP_RESOURCE_MEMBER)
+
+GROUP_CATEGORIES = ("plane", "helicopter", "vehicle", "ship", "static")
+
+_KEY_RE = re.compile(r"\b(?:DictKey|ResKey)_\w+")
+
+# filters of every kind of record: option -> record field. A field holding
+# a list matches every value in it.
+FILTERS: dict[str, dict[str, str]] = {
+    "units": {"id": "unitId", "name": "name", "type": "type", "coalition": "coalition", "country": "country",
+              "category": "category", "group_id": "groupId"},
+    "groups": {"id": "groupId", "name": "name", "type": "types", "coalition": "coalition", "country": "country",
+               "category": "category", "unit_id": "units"},
+    "triggers": {"name": "comment", "key": "keys"},
+    "keys": {"key": "key"},
+}
+
+
+def _find_keys(value: Any) -> list[str]:
+    return _KEY_RE.findall(value) if type(value) is str and "Key_" in value else []
+
+
+def _subtree_keys(data: Any) -> set[str]:
+    keys = set()
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        for _, v in table_items(obj):
+            if type(v) in TABLE_TYPES:
+                stack.append(v)
+            else:
+                keys.update(_find_keys(v))
+    return keys
+
+
+def _key_references(data: Any) -> dict[str, list[str]]:
+    """Map every dictionary and resource key used in `data` to the paths that use it."""
+    from ssf_mission_tools.diff import join_path
+    references: dict[str, list[str]] = {}
+    stack = [(data, "")]
+    while stack:
+        obj, path = stack.pop()
+        for k, v in table_items(obj):
+            if type(v) in TABLE_TYPES:
+                stack.append((v, join_path(path, k)))
+            else:
+                for key in _find_keys(v):
+                    references.setdefault(key, []).append(join_path(path, k))
+    for paths in references.values():
+        paths.sort(key=natural_key)
+    return references
+
+
+def _unit_records(mission: Any) -> tuple[list[dict], list[dict]]:
+    groups, units = [], []
+    coalitions = mission.get("coalition")
+    for side, side_table in table_items(coalitions) if type(coalitions) in TABLE_TYPES else ():
+        countries = side_table.get("country") if type(side_table) is dict else None
+        for _, country in table_items(countries) if type(countries) in TABLE_TYPES else ():
+            if type(country) is not dict:
+                continue
+            for category in GROUP_CATEGORIES:
+                category_table = country.get(category)
+                group_tables = category_table.get("group") if type(category_table) is dict else None
+                for _, group in table_items(group_tables) if type(group_tables) in TABLE_TYPES else ():
+                    if type(group) is not dict:
+                        continue
+                    members = group.get("units")
+                    members = [u for _, u in table_items(members) if type(u) is dict] if type(members) in TABLE_TYPES else []
+                    where = {"coalition": side, "country": country.get("name"), "category": category}
+                    groups.append({"groupId": group.get("groupId"), "name": group.get("name"), **where,
+                                   "units": [u.get("unitId") for u in members],
+                                   "types": sorted({u.get("type") for u in members if u.get("type") is not None}),
+                                   "x": group.get("x"), "y": group.get("y")})
+                    for unit in members:
+                        units.append({"unitId": unit.get("unitId"), "name": unit.get("name"), "type": unit.get("type"),
+                                      **where, "groupId": group.get("groupId"), "group": group.get("name"),
+                                      "x": unit.get("x"), "y": unit.get("y")})
+    return groups, units
+
+
+def _trigger_records(mission: Any) -> list[dict]:
+    rules = mission.get("trigrules")
+    trig = mission.get("trig")
+    triggers = []
+    for index, rule in table_items(rules) if type(rules) in TABLE_TYPES else ():
+        if type(rule) is not dict:
+            continue
+        keys = _subtree_keys(rule)
+        # the Lua code the editor generates for the trigger
+        for _, code in table_items(trig) if type(trig) is dict else ():
+            if type(code) in TABLE_TYPES and index in code:
+                keys.update(_find_keys(code[index]))
+        actions = rule.get("actions")
+        triggers.append({"index": index, "comment": rule.get("comment"), "predicate": rule.get("predicate"),
+                         "actions": [a.get("predicate") for _, a in table_items(actions) if type(a) is dict]
+                         if type(actions) in TABLE_TYPES else [],
+                         "keys": sorted(keys)})
+    return triggers
+
+
+@dataclass
+class MissionIndex:
+    """Records of a mission and, per kind and filter, the positions of the records with each value."""
+    records: dict[str, list[dict]]
+    lookup: dict[str, dict[str, dict[Any, list[int]]]]
+
+    @classmethod
+    def build(cls, tables: dict[str, Any]) -> MissionIndex:
+        """Index the parsed `mission`, `dictionary` and `mapResource` tables in `tables`."""
+        mission = tables.get("mission")
+        mission = mission if type(mission) is dict else {}
+        dictionary = tables.get(DICTIONARY_MEMBER)
+        dictionary = dictionary if type(dictionary) is dict else {}
+        resources = tables.get(MAP_RESOURCE_MEMBER)
+        resources = resources if type(resources) is dict else {}
+        groups, units = _unit_records(mission)
+        references = _key_references(mission)
+        keys = [{"key": key, "text": dictionary.get(key), "file": resources.get(key),
+                 "references": references.get(key, [])}
+                for key in sorted(dictionary.keys() | resources.keys() | references.keys(), key=natural_key)]
+        records = {"units": units, "groups": groups, "triggers": _trigger_records(mission), "keys": keys}
+        lookup: dict[str, dict[str, dict[Any, list[int]]]] = {}
+        for kind, filters in FILTERS.items():
+            lookup[kind] = {option: {} for option in filters}
+            for position, record in enumerate(records[kind]):
+                for option, field in filters.items():
+                    value = record.get(field)
+                    for v in value if type(value) is list else (value,):
+                        if v is not None:
+                            lookup[kind][option].setdefault(v, []).append(position)
+        return cls(records, lookup)
+
+    def query(self, kind: str, **filters: Any) -> list[dict]:
+        """Records of `kind` matching all given filters, in mission order."""
+        matches: set[int] | None = None
+        # start with the filter with the fewest matches
+        for positions in sorted((self.lookup[kind][option].get(value, []) for option, value in filters.items()
+                                 if value is not None), key=len):
+            matches = set(positions) if matches is None else matches.intersection(positions)
+            if not matches:
+                return []
+        records = self.records[kind]
+        return list(records) if matches is None else [records[i] for i in sorted(matches)]
+
+    @classmethod
+    def load(cls, source: str, cfg: Config, cache: ParseCache | None = None) -> MissionIndex:
+        """Index a .miz file or the mission/ directory of a development directory.
+
+        With a `cache`, the index is looked up by the hash of the indexed
+        members and only built if the mission changed.
+        """
+        import hashlib
+        from ssf_mission_tools.parse_lua import parse_lua_table_bytes
+        raw = _read_members(source, cfg)
+        key = None
+        if cache is not None:
+            digest = hashlib.sha256()
+            for member in INDEXED_MEMBERS:
+                data = raw.get(member, b"")
+                digest.update(b"%s:%d:" % (member.encode("utf-8"), len(data)))
+                digest.update(data)
+            key = cache.key(_QUERY_INDEX_VERSION + digest.digest())
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+        with phase("parse"):
+            tables = {member: parse_lua_table_bytes(data, member, cache)["data"] for member, data in raw.items()}
+        with phase("index"):
+            index = cls.build(tables)
+        if cache is not None:
+            cache.put(key, index)
+        return index
+
+
+def _read_members(source: str, cfg: Config) -> dict[str, bytes]:
+    import os
+    import zipfile
+    members = {}
+    if os.path.isdir(source):
+        from ssf_mission_tools.build import Build
+        from ssf_mission_tools.shards import assemble_shards
+        if not os.path.isdir(os.path.join(source, "mission")):
+            raise ValueError(f"{source} is not a development directory")
+        sources = Build(cfg).collect_sources(source, release=False)
+        for member in INDEXED_MEMBERS:
+            path = sources.get(member)
+            if path is None:
+                continue
+            if os.path.isdir(path):
+                members[member] = assemble_shards(path).encode("utf-8")
+            else:
+                with open(path, "rb") as fh:
+                    members[member] = fh.read()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source, "r") as z:
+            names = set(z.namelist())
+            for member in INDEXED_MEMBERS:
+                if member in names:
+                    members[member] = z.read(member)
+    else:
+        raise ValueError(f"{source} is neither a .miz file nor a development directory")
+    if "mission" not in members:
+        raise ValueError(f"{source} has no mission table")
+    return members
+
+
+class Query:
+
+    @classmethod
+    def add_subparser(cls, parser: ArgumentParser) -> None:
+        parser.add_argument("kind", choices=tuple(FILTERS), help="What to list")
+        parser.add_argument("-s", "--source", type=str, default=".", help="A .miz file or a development directory (default: .)")
+        parser.add_argument("--id", type=int, help="unitId of units, groupId of groups")
+        parser.add_argument("--name", type=str, help="Name of units and groups, comment of triggers")
+        parser.add_argument("--type", type=str, help="Unit type, e.g. 'F-16C_50'; groups with a unit of this type")
+        parser.add_argument("--coalition", type=str, help="Coalition of units and groups: blue, red or neutrals")
+        parser.add_argument("--country", type=str, help="Country of units and groups, e.g. 'USA'")
+        parser.add_argument("--category", type=str, choices=GROUP_CATEGORIES, help="Category of units and groups")
+        parser.add_argument("--group-id", type=int, help="Units of the group with this groupId")
+        parser.add_argument("--unit-id", type=int, help="The group of the unit with this unitId")
+        parser.add_argument("--key", type=str, help="Dictionary or resource key, e.g. 'DictKey_57'; triggers that use it")
+        parser.add_argument("--no-cache", action="store_true", help="Build the index without using the parse cache")
+
+    @classmethod
+    def handle_arguments(cls, args: Any, cfg: Config) -> int:
+        import json
+        all_options = {option for filters in FILTERS.values() for option in filters}
+        filters = {option: getattr(args, option, None) for option in all_options}
+        filters = {option: value for option, value in filters.items() if value is not None}
+        for option in filters:
+            if option not in FILTERS[args.kind]:
+                print(f"--{option.replace('_', '-')} does not apply to {args.kind}")
+                return -1
+        cache = None if args.no_cache else ParseCache.for_config(cfg)
+        try:
+            with phase("load"):
+                index = MissionIndex.load(args.source, cfg, cache)
+        except (OSError, ValueError) as e:
+            print(f"Query failed: {e}")
+            return -1
+        with phase("query"):
+            results = index.query(args.kind, **filters)
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        # like grep: 1 when nothing matches
+        return 0 if results else 1
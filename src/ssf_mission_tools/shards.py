@@ -0,0 +1,147 @@
+"""Sharded storage of the mission table in the development directory.
+
+With the sharded layout, `mission/mission` is replaced by the directory
+`mission/mission.shards`. Every group (`coalition/blue/country/2/plane/group/5.lua`)
+and the large trigger and drawing tables (`trig.lua`, `triggers.lua`, ...)
+are stored in shard files, everything else in `root.lua`. In the root file, every shard is replaced by
+a `-- shard: <file>` line.
+
+Shard files hold the lines of their subtable exactly as they appear in the
+sorted mission file, so `assemble_shards` rebuilds the mission by replacing
+the marker lines with the shard files, without parsing them. A shard is only
+written when its content changed, so syncs and git only touch what changed.
+"""
+from __future__ import annotations
+
+import io
+import os
+import re
+from typing import Any
+
+from ssf_mission_tools.parse_lua import TABLE_TYPES, LuaComment, sort_table, table_items, write_lua_entries, write_lua_table
+
+# suffix of the directory replacing a sharded member in mission/
+SHARDS_SUFFIX = ".shards"
+ROOT_FILE = "root.lua"
+
+# top-level mission tables stored in their own shard
+_TOP_LEVEL_SHARDS = ("drawings", "trig", "triggers", "trigrules")
+
+_MARKER = "shard: "
+_MARKER_RE = re.compile(r"^\t*-- shard: (\S+)\n", re.M)
+
+
+def shards_dir(member_path: str) -> str:
+    """Directory holding the shards of the member file at `member_path`."""
+    return member_path + SHARDS_SUFFIX
+
+
+def _safe_key(k: Any) -> bool:
+    # keys become path components of the shard files
+    return (type(k) is int and k >= 0) or (type(k) is str and k.isidentifier())
+
+
+def shard_points(data: Any) -> list[tuple[tuple, str]]:
+    """Return the key path and file name of every shard of a mission table."""
+    if type(data) is not dict:
+        return []
+    points = []
+    for key in _TOP_LEVEL_SHARDS:
+        if type(data.get(key)) in TABLE_TYPES and data[key]:
+            points.append(((key,), f"{key}.lua"))
+    coalition = data.get("coalition")
+    for side, side_table in table_items(coalition) if type(coalition) in TABLE_TYPES else ():
+        countries = side_table.get("country") if type(side_table) is dict else None
+        if type(countries) not in TABLE_TYPES:
+            continue
+        for index, country in table_items(countries):
+            if type(country) is not dict:
+                continue
+            for category, table in country.items():
+                groups = table.get("group") if type(table) is dict else None
+                if type(groups) not in TABLE_TYPES:
+                    continue
+                for group_index, _ in table_items(groups):
+                    keys = ("coalition", side, "country", index, category, "group", group_index)
+                    if all(_safe_key(k) for k in keys):
+                        points.append((keys, "/".join(str(k) for k in keys) + ".lua"))
+    return points
+
+
+def _write_if_changed(path: str, text: str) -> bool:
+    data = text.encode("utf-8")
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as fh:
+                if fh.read() == data:
+                    return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def write_shards(variable: str | None, data: Any, directory: str) -> tuple[int, int]:
+    """Write a mission table sorted into shard files below `directory`.
+
+    Shards whose content did not change are not written, shards that no
+    longer exist are removed. Returns the number of written and unchanged
+    files.
+    """
+    sort_table(data)
+    points = shard_points(data)
+    texts = {}
+    for keys, name in points:
+        parent = data
+        for k in keys[:-1]:
+            parent = parent[k]
+        buf = io.StringIO()
+        write_lua_entries(buf, {keys[-1]: parent[keys[-1]]}, len(keys))
+        texts[name] = buf.getvalue()
+
+    # the root is written with a marker in place of each shard
+    replaced = []
+    try:
+        for keys, name in points:
+            parent = data
+            for k in keys[:-1]:
+                parent = parent[k]
+            replaced.append((parent, keys[-1], parent[keys[-1]]))
+            parent[keys[-1]] = LuaComment(_MARKER + name)
+        buf = io.StringIO()
+        write_lua_table(buf, variable, data)
+        texts[ROOT_FILE] = buf.getvalue()
+    finally:
+        for parent, key, value in reversed(replaced):
+            parent[key] = value
+
+    written = 0
+    for name, text in texts.items():
+        written += _write_if_changed(os.path.join(directory, *name.split("/")), text)
+    for root, _, files in os.walk(directory, topdown=False):
+        for f in files:
+            name = os.path.relpath(os.path.join(root, f), directory).replace(os.sep, "/")
+            if name not in texts:
+                os.remove(os.path.join(root, f))
+        if root != directory and not os.listdir(root):
+            os.rmdir(root)
+    return written, len(texts) - written
+
+
+def assemble_shards(directory: str) -> str:
+    """Return the text of the sorted mission file stored in `directory`."""
+    def read(name: str) -> str:
+        with open(os.path.join(directory, *name.split("/")), "r", encoding="utf-8", newline="") as fh:
+            return fh.read()
+
+    def shard(m: re.Match) -> str:
+        name = m.group(1)
+        if ".." in name.split("/"):
+            raise ValueError(f"Unsafe shard path {name}")
+        return read(name)
+
+    return _MARKER_RE.sub(shard, read(ROOT_FILE))
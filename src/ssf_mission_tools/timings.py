@@ -0,0 +1,142 @@
+"""Per-phase timing and memory instrumentation for the CLI.
+
+Commands wrap their phases in `phase(name)`. When enabled with the global
+`--timings`/`--timings-json` options, each phase records wall time, CPU
+time, the tracemalloc peak (with `--trace-memory`) and the peak RSS of the
+process so far. `--profile PHASE` dumps a cProfile file for one phase.
+Phases can be nested; nested phases are reported as `outer/inner`.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator
+
+
+@dataclass
+class PhaseStats:
+    name: str
+    wall: float
+    cpu: float
+    peak_traced: int | None = None
+    max_rss: int | None = None
+
+
+def _max_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Timings:
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_memory = False
+        self.profile_phase: str | None = None
+        self.profile_output: str | None = None
+        self.phases: list[PhaseStats | None] = []
+        self._stack: list[list] = []
+        # whether tracemalloc was started here, and is to be stopped here
+        self._started_tracing = False
+
+    def configure(self, enabled: bool = False, trace_memory: bool = False,
+                  profile_phase: str | None = None, profile_output: str | None = None) -> None:
+        self.enabled = enabled or trace_memory
+        self.trace_memory = trace_memory
+        self.profile_phase = profile_phase
+        self.profile_output = profile_output or (f"ssf-tools-{profile_phase}.prof" if profile_phase else None)
+        self.phases = []
+        if self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        else:
+            self.close()
+
+    def close(self) -> None:
+        """Stop tracing memory allocations if `configure` started it."""
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _qualified(self, name: str) -> str:
+        return "/".join([frame[0] for frame in self._stack] + [name])
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        qualified = self._qualified(name)
+        profile = self.profile_phase in (name, qualified)
+        if not self.enabled and not profile:
+            yield
+            return
+        profiler = None
+        if profile:
+            import cProfile
+            profiler = cProfile.Profile()
+        traced = None
+        if self.trace_memory:
+            import tracemalloc
+            # remember the peak of the enclosing phase before resetting it
+            peak = tracemalloc.get_traced_memory()[1]
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            traced = tracemalloc
+        frame = [name, 0]
+        self._stack.append(frame)
+        # reserve the slot so phases are reported in the order they started
+        index = len(self.phases)
+        self.phases.append(None)
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self.profile_output)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._stack.pop()
+            peak = None
+            if traced is not None:
+                peak = max(frame[1], traced.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+            self.phases[index] = PhaseStats(qualified, wall, cpu, peak, _max_rss())
+
+    def record(self, name: str, wall: float, cpu: float, peak_traced: int | None = None) -> None:
+        """Add a phase measured elsewhere, for example in a worker process."""
+        if self.enabled:
+            self.phases.append(PhaseStats(self._qualified(name), wall, cpu, peak_traced, None))
+
+    def format_table(self) -> str:
+        def mb(value: int | None) -> str:
+            return "-" if value is None else f"{value / (1024 * 1024):.1f}"
+        phases = [p for p in self.phases if p is not None]
+        width = max([len("phase")] + [len(p.name) for p in phases])
+        lines = [f"{'phase':<{width}}  {'wall s':>8}  {'cpu s':>8}  {'peak MB':>8}  {'max RSS MB':>10}"]
+        for p in phases:
+            lines.append(f"{p.name:<{width}}  {p.wall:8.3f}  {p.cpu:8.3f}  {mb(p.peak_traced):>8}  {mb(p.max_rss):>10}")
+        return "\n".join(lines)
+
+    def to_json(self) -> dict:
+        return {"phases": [asdict(p) for p in self.phases if p is not None]}
+
+
+# process-wide recorder, configured by the CLI entry point
+TIMINGS = Timings()
+
+
+def phase(name: str):
+    return TIMINGS.phase(name)
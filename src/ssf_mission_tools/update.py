@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser, Namespace
+from typing import Any, Callable
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.common import SORTED_LUA_MEMBERS, is_synced_member
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.init import Init
+from ssf_mission_tools.manifest import SyncManifest
+from ssf_mission_tools.shards import shards_dir
+from ssf_mission_tools.timings import phase
+from ssf_mission_tools.utils import unzip
+
+
+class Update(Init):
+
+    def unpack_changed_members(self, mission_name: str, workdir: str, members: list[str]) -> None:
+        import os
+        mission_src = os.path.join(self.cfg.mission_dir, mission_name)
+        mission_dst = os.path.join(workdir, "build")
+        # only the changed members are extracted, build/ is not wiped
+        unzip(mission_src, mission_dst, members=members, jobs=self.jobs)
+
+    def copy_member(self, workdir: str, member: str, crc_changed: bool = True) -> None:
+        import os
+        from ssf_mission_tools.filesync import copy_file, is_unchanged
+        src_path = os.path.join(workdir, "build", *member.split("/"))
+        dst_path = os.path.join(workdir, "mission", *member.split("/"))
+        # --full and a change of mission sync members that may already be up
+        # to date. A member whose CRC changed is always copied: zip times
+        # have a resolution of 2 seconds and are often fixed, so an equal
+        # size and mtime does not mean equal content.
+        if crc_changed or not is_unchanged(src_path, os.stat(src_path), dst_path):
+            copy_file(src_path, dst_path)
+
+    def remove_member(self, workdir: str, member: str) -> None:
+        import os
+        import shutil
+        for base in ("build", "mission"):
+            path = os.path.join(workdir, base, *member.split("/"))
+            if os.path.isfile(path):
+                os.remove(path)
+            if os.path.isdir(shards_dir(path)):
+                shutil.rmtree(shards_dir(path))
+
+    @classmethod
+    def add_subparser(cls, parser: ArgumentParser) -> None:
+        parser.add_argument("-d", "--directory", type=str, nargs="+", default=["."],
+                            help="Development directories to update, glob patterns are expanded")
+        parser.add_argument("-m", "--mission", type=str, help="Mission to update from (default: mission of the last sync)")
+        parser.add_argument("--full", action="store_true", help="Sync all members, even if their CRC did not change")
+        parser.add_argument("--no-cache", action="store_true", help="Parse all Lua files without using the parse cache")
+        parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="Worker processes for sorting Lua files, or for missions with several directories (0: one per CPU core, 1: serial)")
+        parser.add_argument("--in-memory", action="store_true", help="Process the mission straight from the .miz without extracting it to build/")
+        parser.add_argument("--shard", action="store_true", help="Store the mission table as shard files (kept once the directory is sharded)")
+        parser.add_argument("--watch", action="store_true", help="Keep running and sync the mission each time it is saved")
+
+    def sync(self, mission_name: str, workdir: str, full: bool = False, in_memory: bool = False) -> int:
+        """Sync the members of the mission that changed since the last sync."""
+        import os
+        previous = SyncManifest.load(workdir)
+        with phase("manifest"):
+            current = SyncManifest.from_archive(mission_name, os.path.join(self.cfg.mission_dir, mission_name))
+        if previous is None:
+            # no known CRCs, the files in mission/ are checked instead
+            changed, removed, crc_changed = sorted(current.members), [], set()
+        else:
+            changed, removed = previous.diff(current)
+            # members whose CRC differs from the last sync
+            crc_changed = set(changed)
+        if full or (previous is not None and previous.mission != mission_name):
+            # sync everything; only what is gone from the archive is removed
+            changed = sorted(current.members)
+        changed = [m for m in changed if is_synced_member(m)]
+        removed = [m for m in removed if is_synced_member(m)]
+        if not changed and not removed:
+            current.save(workdir)
+            print(f"Development directory {workdir} is up to date with {mission_name}")
+            return 0
+        print(f"Updating {len(changed)} changed and {len(removed)} removed member(s) from {mission_name}...")
+        for member in changed:
+            print(f"  {member}")
+        if in_memory:
+            with phase("sync"):
+                errors = self.sync_from_archive(mission_name, workdir, changed)
+        else:
+            with phase("unpack"):
+                if changed:
+                    self.unpack_changed_members(mission_name, workdir, changed)
+            with phase("copy"):
+                for member in changed:
+                    if member not in SORTED_LUA_MEMBERS:
+                        self.copy_member(workdir, member, member in crc_changed)
+            with phase("sort"):
+                errors = self.sort_and_copy_special_files(workdir, [m for m in changed if m in SORTED_LUA_MEMBERS])
+        for member, error in errors.items():
+            print(f"Failed to sort {member}: {error}")
+        if errors:
+            # keep the previous manifest so the failed members are retried
+            return -1
+        for member in removed:
+            print(f"  {member} (removed)")
+            self.remove_member(workdir, member)
+        current.save(workdir)
+        print(f"Development directory {workdir} updated successfully.")
+        return 0
+
+    def watch(self, mission_name: str, workdir: str, in_memory: bool = False,
+              should_stop: Callable[[], bool] = lambda: False) -> None:
+        """Sync the mission each time it is saved, until interrupted."""
+        import os
+        import time
+        from ssf_mission_tools.watch import watch_file
+
+        def on_change() -> None:
+            start = time.perf_counter()
+            try:
+                rc = self.sync(mission_name, workdir, in_memory=in_memory)
+            except Exception as e:
+                # keep watching, the next save is synced again
+                print(f"Update failed: {e}")
+                return
+            status = "done" if rc == 0 else "failed"
+            print(f"[{time.strftime('%H:%M:%S')}] Sync {status} in {time.perf_counter() - start:.2f}s")
+
+        mission_path = os.path.join(self.cfg.mission_dir, mission_name)
+        print(f"Watching {mission_path} for changes, press Ctrl+C to stop")
+        watch_file(mission_path, on_change, should_stop=should_stop)
+
+    @classmethod
+    def handle_arguments(cls, args: Any, cfg: Config) -> int:
+        import os
+        jobs = args.jobs if args.jobs is not None else cfg.jobs
+        if isinstance(args.directory, list):
+            from ssf_mission_tools.batch import expand_directories, run_batch_command
+            directories = expand_directories(args.directory)
+            if not directories:
+                print(f"No development directory matches {' '.join(args.directory)}")
+                return -1
+            if len(directories) > 1:
+                if args.mission or args.watch:
+                    print("--mission and --watch can only be used with a single directory")
+                    return -1
+                # one mission per worker, each sorted serially
+                runs = [Namespace(**{**vars(args), "directory": d, "jobs": 1}) for d in directories]
+                return run_batch_command(Update, runs, cfg, jobs)
+            args = Namespace(**{**vars(args), "directory": directories[0]})
+        workdir = args.directory
+        previous = SyncManifest.load(workdir)
+        mission_name = args.mission or (previous.mission if previous else None)
+        if not mission_name:
+            print(f"No previous sync found in {workdir}, pass --mission or run init first")
+            return -1
+        # a watching process keeps recent parse results in memory
+        cache = None if args.no_cache else ParseCache.for_config(cfg, memory_entries=8 if args.watch else 0)
+        # the layout of the directory is kept, --shard switches to shards
+        shard = args.shard or os.path.isdir(shards_dir(os.path.join(workdir, "mission", "mission")))
+        update = Update(cfg, cache, jobs, shard)
+        if not update.check_mission_exists(mission_name):
+            print(f"Mission {mission_name} does not exist in {cfg.mission_dir}")
+            return -1
+        rc = update.sync(mission_name, workdir, args.full, args.in_memory)
+        if not args.watch:
+            return rc
+        try:
+            update.watch(mission_name, workdir, args.in_memory)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        return 0
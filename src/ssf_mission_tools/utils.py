@@ -1,33 +1,174 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
+import struct
 import zipfile
 import os
-from typing import Iterable
+from typing import BinaryIO, Iterable
 
 
-def _is_within_directory(directory: Path, target: Path) -> bool:
-    try:
-        directory = directory.resolve()
-        target = target.resolve()
-        return str(target).startswith(str(directory))
-    except Exception:
-        return False
+# members at least this large are decompressed by worker threads
+_PARALLEL_MIN_SIZE = 256 * 1024
+
+
+def member_parts(name: str) -> tuple[str, ...]:
+    """Split a zip member name into path components, rejecting unsafe names.
+
+    The check is lexical, no filesystem access: absolute paths, drive
+    letters and `..` components raise ValueError (zip slip).
+    """
+    parts = tuple(p for p in name.replace("\\", "/").split("/") if p not in ("", "."))
+    if not parts or name.startswith(("/", "\\")) or ".." in parts or ":" in parts[0]:
+        raise ValueError(f"Unsafe path in zip archive: {name}")
+    return parts
+
+
+def select_members(infos: Iterable[zipfile.ZipInfo], include: Iterable[str] | None = None,
+                   exclude: Iterable[str] = (), ignore_case: bool = False) -> list[zipfile.ZipInfo]:
+    """Members whose name matches one of the `include` glob patterns (all if None) and none of `exclude`."""
+    from fnmatch import fnmatchcase
+    fold = str.lower if ignore_case else str
+    include = None if include is None else tuple(fold(p) for p in include)
+    exclude = tuple(fold(p) for p in exclude)
+    return [info for info in infos
+            if (include is None or any(fnmatchcase(fold(info.filename), p) for p in include))
+            and not any(fnmatchcase(fold(info.filename), p) for p in exclude)]
 
 
-def unzip(zip_path: str | Path, dest_dir: str | Path, members: Iterable[str] | None = None) -> None:
-    """Safely extract a zip archive to `dest_dir`.
+def _extract_member(z: zipfile.ZipFile, info: zipfile.ZipInfo, path: str) -> None:
+    import shutil
+    with z.open(info) as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    _set_mtime(path, info)
 
-    This function verifies each member path to prevent zip-slip attacks.
+
+def unzip(zip_path: str | Path, dest_dir: str | Path, members: Iterable[str] | None = None,
+          include: Iterable[str] | None = None, exclude: Iterable[str] = (), jobs: int = 0,
+          ignore_case: bool = False) -> list[str]:
+    """Safely extract a zip archive to `dest_dir`, return the extracted member names.
+
+    Only `members` are extracted if given, further filtered by the
+    `include` and `exclude` glob patterns (ignoring case with `ignore_case`).
+    All member paths are checked before anything is written, to prevent
+    zip-slip attacks. Directories
+    are created up front; members of at least 256 KiB are decompressed by
+    `jobs` threads (one per CPU core if 0), the rest in the calling thread.
+    Files get the modification time stored in the archive, so extracting an
+    unchanged member again leaves its size and mtime as they were.
     """
-    zip_path = Path(zip_path)
-    dest_dir = Path(dest_dir)
-    dest_dir.mkdir(parents=True, exist_ok=True)
+    dest = os.path.abspath(dest_dir)
+    os.makedirs(dest, exist_ok=True)
 
     with zipfile.ZipFile(zip_path, "r") as z:
-        namelist = members if members is not None else z.namelist()
-        for member in namelist:
-            member_path = dest_dir.joinpath(member)
-            if not _is_within_directory(dest_dir, member_path):
-                raise ValueError(f"Unsafe path in zip archive: {member}")
-        z.extractall(path=dest_dir, members=namelist)
+        infos = z.infolist() if members is None else [z.getinfo(m) for m in members]
+        infos = select_members(infos, include, exclude, ignore_case)
+        targets = [(info, os.path.join(dest, *member_parts(info.filename))) for info in infos]
+        directories = {path if info.is_dir() else os.path.dirname(path) for info, path in targets}
+        for directory in sorted(directories):
+            os.makedirs(directory, exist_ok=True)
+        files = [(info, path) for info, path in targets if not info.is_dir()]
+        large = [(info, path) for info, path in files if info.file_size >= _PARALLEL_MIN_SIZE]
+        workers = min(jobs or os.cpu_count() or 1, len(large))
+        if workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            import threading
+            # zlib releases the GIL; every thread reads through its own handle
+            local = threading.local()
+            handles: list[zipfile.ZipFile] = []
+
+            def extract(info: zipfile.ZipInfo, path: str) -> None:
+                if not hasattr(local, "zip"):
+                    local.zip = zipfile.ZipFile(zip_path, "r")
+                    handles.append(local.zip)
+                _extract_member(local.zip, info, path)
+
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(extract, info, path) for info, path in large]
+                    for info, path in files:
+                        if info.file_size < _PARALLEL_MIN_SIZE:
+                            _extract_member(z, info, path)
+                    for future in futures:
+                        future.result()
+            finally:
+                for handle in handles:
+                    handle.close()
+        else:
+            for info, path in files:
+                _extract_member(z, info, path)
+    return [info.filename for info, _ in targets]
+
+
+def _set_mtime(path: str, info: zipfile.ZipInfo) -> None:
+    import time
+    try:
+        ts = time.mktime(info.date_time + (0, 0, -1))
+        os.utime(path, (ts, ts))
+    except (OverflowError, ValueError, OSError):
+        pass
+
+
+def zip_member_crcs(zip_path: str | Path) -> dict[str, tuple[int, int]]:
+    """Return CRC-32 and uncompressed size of every file in a zip archive.
+
+    Values are read from the central directory, no member is decompressed.
+    """
+    with zipfile.ZipFile(zip_path, "r") as z:
+        return {info.filename: (info.CRC, info.file_size) for info in z.infolist() if not info.is_dir()}
+
+
+@dataclass
+class RawZipMember:
+    """A zip member with its data exactly as stored in the archive."""
+    name: str
+    compress_type: int
+    crc: int
+    file_size: int
+    data: bytes
+    date_time: tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0)
+
+
+def read_raw_member(fh: BinaryIO, info: zipfile.ZipInfo) -> bytes:
+    """Read the still compressed data of `info` from an open archive file."""
+    fh.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, fh.read(zipfile.sizeFileHeader))
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+    # skip file name and extra field of the local header
+    fh.seek(header[10] + header[11], os.SEEK_CUR)
+    return fh.read(info.compress_size)
+
+
+def write_raw_zip(path: str | Path, members: Iterable[RawZipMember]) -> None:
+    """Write a zip archive from members whose data is already compressed.
+
+    Nothing is recompressed, which allows copying deflated data from a
+    previous archive as is. Zip64 archives are not supported.
+    """
+    central = []
+    with open(path, "wb") as fh:
+        for m in members:
+            name = m.name.encode("utf-8")
+            flags = 0 if name.isascii() else 0x800
+            year, month, day, hour, minute, second = m.date_time
+            dosdate = (max(year, 1980) - 1980) << 9 | month << 5 | day
+            dostime = hour << 11 | minute << 5 | second // 2
+            offset = fh.tell()
+            if max(offset, len(m.data), m.file_size) > 0xFFFFFFFF:
+                raise ValueError(f"Archive too large for {m.name}, zip64 is not supported")
+            fh.write(struct.pack(zipfile.structFileHeader, zipfile.stringFileHeader, 20, 0, flags,
+                                 m.compress_type, dostime, dosdate, m.crc, len(m.data), m.file_size, len(name), 0))
+            fh.write(name)
+            fh.write(m.data)
+            central.append(struct.pack(zipfile.structCentralDir, zipfile.stringCentralDir, 20, 0, 20, 0, flags,
+                                       m.compress_type, dostime, dosdate, m.crc, len(m.data), m.file_size,
+                                       len(name), 0, 0, 0, 0, 0, offset) + name)
+        start = fh.tell()
+        for entry in central:
+            fh.write(entry)
+        size = fh.tell() - start
+        if len(central) > 0xFFFF or start > 0xFFFFFFFF:
+            raise ValueError("Archive too large, zip64 is not supported")
+        fh.write(struct.pack(zipfile.structEndArchive, zipfile.stringEndArchive, 0, 0,
+                             len(central), len(central), size, start, 0))
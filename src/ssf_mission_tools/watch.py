@@ -0,0 +1,141 @@
+"""Wait for a file to be rewritten, for `update --watch`.
+
+On Linux the directory of the file is watched with inotify; elsewhere the
+size and modification time of the file are polled. Once a change is seen,
+the file has to stay unchanged for a debounce interval and, for .miz files,
+be a complete zip archive before the callback runs, so the bursts of writes
+of a save in the DCS editor trigger a single sync.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Callable
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.25
+
+# inotify(7) event flags
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    """Size and modification time of `path`, None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def archive_complete(path: str) -> bool:
+    """Whether a .miz can be opened, i.e. its central directory was written."""
+    import zipfile
+    try:
+        with zipfile.ZipFile(path, "r"):
+            return True
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class StatPoller:
+    """Fallback watcher: the caller compares file signatures after each wait."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(min(timeout, self.interval))
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Watch the directory of `path` with inotify and report events for `path`."""
+
+    def __init__(self, path: str) -> None:
+        import ctypes
+        import ctypes.util
+        self.path = path
+        self.name = os.fsencode(os.path.basename(path))
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(path))
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds, return whether `path` was written."""
+        import select
+        import struct
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], remaining)[0]:
+                return False
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset, hit = 0, False
+            while offset + 16 <= len(data):
+                # struct inotify_event: wd, mask, cookie, len, name[len]
+                _, _, _, length = struct.unpack_from("iIII", data, offset)
+                name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+                hit = hit or name == self.name
+                offset += 16 + length
+            if hit:
+                return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def open_watcher(path: str, poll_interval: float = DEFAULT_POLL_INTERVAL) -> InotifyWatcher | StatPoller:
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return StatPoller(path, poll_interval)
+
+
+def wait_until_settled(path: str, watcher: InotifyWatcher | StatPoller, debounce: float = DEFAULT_DEBOUNCE) -> tuple[int, int] | None:
+    """Wait until `path` was not written for `debounce` seconds and is complete."""
+    signature = file_signature(path)
+    while True:
+        busy = watcher.wait(debounce)
+        current = file_signature(path)
+        if not busy and current == signature and current is not None and \
+                (not path.endswith(".miz") or archive_complete(path)):
+            return current
+        signature = current
+
+
+def watch_file(path: str, on_change: Callable[[], None], debounce: float = DEFAULT_DEBOUNCE,
+               poll_interval: float = DEFAULT_POLL_INTERVAL, should_stop: Callable[[], bool] = lambda: False) -> None:
+    """Call `on_change` each time `path` has been rewritten, until `should_stop()`."""
+    watcher = open_watcher(path, poll_interval)
+    try:
+        last = file_signature(path)
+        while not should_stop():
+            watcher.wait(poll_interval)
+            current = file_signature(path)
+            if current is None or current == last:
+                continue
+            last = wait_until_settled(path, watcher, debounce)
+            on_change()
+    finally:
+        watcher.close()
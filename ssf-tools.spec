@@ -6,7 +6,17 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # subcommand modules are imported lazily by name in cli.py
+    hiddenimports=[
+        'ssf_mission_tools.build',
+        'ssf_mission_tools.cache',
+        'ssf_mission_tools.config',
+        'ssf_mission_tools.daemon',
+        'ssf_mission_tools.diff',
+        'ssf_mission_tools.init',
+        'ssf_mission_tools.query',
+        'ssf_mission_tools.update',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -16,19 +26,18 @@ a = Analysis(
 )
 pyz = PYZ(a.pure)
 
+# one-dir build: a one-file executable unpacks itself to a temporary
+# directory on every launch, which dominates the startup time of the CLI
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='ssf-tools',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +45,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='ssf-tools',
+)
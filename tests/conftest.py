@@ -0,0 +1,21 @@
+import zipfile
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+
+def _write_miz(path: Path, members: dict[str, str | bytes]) -> Path:
+    # written next to the target and moved into place, so a watcher never sees half an archive
+    tmp = path.with_suffix(".tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, content in members.items():
+            z.writestr(name, content)
+    tmp.replace(path)
+    return path
+
+
+@pytest.fixture
+def write_miz() -> Callable[[Path, dict[str, str | bytes]], Path]:
+    """Write a .miz file with the given members and their content, return its path."""
+    return _write_miz
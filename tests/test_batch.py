@@ -0,0 +1,48 @@
+from argparse import Namespace
+from pathlib import Path
+
+from ssf_mission_tools.batch import expand_missions
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.init import Init
+from ssf_mission_tools.manifest import SyncManifest
+from ssf_mission_tools.update import Update
+
+
+def members(value: int) -> dict:
+    return {"mission": f'mission = \n{{\n\t["a"] = {value},\n}} -- end of mission\n', "theatre": "Caucasus"}
+
+
+def test_expand_missions(tmp_path: Path):
+    for name in ("op_1.miz", "op_2.miz", "other.miz"):
+        (tmp_path / name).touch()
+    assert expand_missions(["op_1.miz"], str(tmp_path), "dev") == [("op_1.miz", "dev")]
+    assert expand_missions(["op_*.miz", "x.miz=custom"], str(tmp_path), "campaign") == [
+        ("x.miz", "custom"),
+        ("op_1.miz", str(Path("campaign") / "op_1")),
+        ("op_2.miz", str(Path("campaign") / "op_2")),
+    ]
+    assert expand_missions(["none_*.miz"], str(tmp_path), "campaign") == []
+
+
+def test_batch_init_and_update(tmp_path: Path, capsys, write_miz):
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    write_miz(missions / "op_1.miz", members(1))
+    write_miz(missions / "op_2.miz", members(2))
+    cfg = Config(mission_dir=missions.as_posix())
+    campaign = tmp_path / "campaign"
+    args = Namespace(directory=str(campaign), mission=["op_*.miz"], no_cache=True, jobs=2, in_memory=True, shard=False)
+    assert Init.handle_arguments(args, cfg) == 0
+    assert SyncManifest.load(campaign / "op_1").mission == "op_1.miz"
+    assert '["a"] = 2' in (campaign / "op_2" / "mission" / "mission").read_text(encoding="utf-8")
+    assert "2 mission(s): 2 succeeded, 0 failed" in capsys.readouterr().out
+
+    write_miz(missions / "op_2.miz", members(3))
+    (missions / "op_1.miz").unlink()
+    args = Namespace(directory=[str(campaign / "op_*")], mission=None, full=False, no_cache=True, jobs=2,
+                     in_memory=True, shard=False, watch=False)
+    assert Update.handle_arguments(args, cfg) == -1
+    out = capsys.readouterr().out
+    assert "2 mission(s): 1 succeeded, 1 failed" in out
+    assert "Mission op_1.miz does not exist" in out
+    assert '["a"] = 3' in (campaign / "op_2" / "mission" / "mission").read_text(encoding="utf-8")
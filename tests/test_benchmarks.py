@@ -0,0 +1,19 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_benchmarks_smoke(tmp_path: Path):
+    out = tmp_path / "bench.json"
+    cmd = [sys.executable, "benchmarks/run_benchmarks.py", "--no-mission-01", "--groups", "10,20",
+           "--images", "2", "--image-size", "1024", "--triggers", "5", "--repeat", "1", "-o", str(out)]
+    p = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert p.returncode == 0, p.stderr
+    report = json.loads(out.read_text(encoding="utf-8"))
+    benchmarks = {(r["dataset"], r["benchmark"]) for r in report["results"]}
+    assert benchmarks == {(f"synthetic-{g}", b) for g in (10, 20) for b in ("parse", "lazy", "sort", "encode", "unzip", "init")} | \
+        {("--version", "startup"), ("--help", "startup")}
+    assert all(r["seconds"] > 0 for r in report["results"])
@@ -0,0 +1,75 @@
+import os
+import zipfile
+from pathlib import Path
+
+from ssf_mission_tools.build import Build
+from ssf_mission_tools.config import Config
+
+
+def make_workdir(tmp_path: Path) -> Path:
+    workdir = tmp_path / "dev"
+    (workdir / "mission" / "KNEEBOARD" / "IMAGES").mkdir(parents=True)
+    (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "place_images_here").touch()
+    (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "map.png").write_bytes(os.urandom(4096))
+    (workdir / "mission" / "mission").write_text('mission = \n{\n} -- end of mission\n' * 50, encoding="utf-8")
+    (workdir / "mission" / "theatre").write_text("Caucasus", encoding="utf-8")
+    (workdir / "scripts").mkdir()
+    (workdir / "scripts" / "Moose.lua").write_text("-- moose\n" * 100, encoding="utf-8")
+    return workdir
+
+
+def test_build_dev_and_release(tmp_path: Path):
+    workdir = make_workdir(tmp_path)
+    build = Build(Config(mission_dir=tmp_path.as_posix()), jobs=2)
+    out = tmp_path / "out.miz"
+
+    assert build.build(str(workdir), str(out)) == (0, 3)
+    with zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        assert sorted(z.namelist()) == ["KNEEBOARD/IMAGES/map.png", "mission", "theatre"]
+        assert z.read("theatre") == b"Caucasus"
+
+    assert build.build(str(workdir), str(out), release=True) == (3, 1)
+    with zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        assert z.read("I10n/Default/Moose.lua") == (workdir / "scripts" / "Moose.lua").read_bytes()
+
+
+def test_build_recompresses_changed_members(tmp_path: Path):
+    workdir = make_workdir(tmp_path)
+    build = Build(Config(mission_dir=tmp_path.as_posix()), jobs=1)
+    out = tmp_path / "out.miz"
+    build.build(str(workdir), str(out))
+    (workdir / "mission" / "theatre").write_text("Syria", encoding="utf-8")
+    assert build.build(str(workdir), str(out)) == (2, 1)
+    with zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        assert z.read("theatre") == b"Syria"
+
+
+def test_build_release_minified_bundle(tmp_path: Path):
+    from ssf_mission_tools.cache import ParseCache
+    from ssf_mission_tools.minify import ScriptMinifier
+    workdir = make_workdir(tmp_path)
+    (workdir / "scripts" / "Moose.lua").write_text("-- moose\nMOOSE = {}  -- table\n" * 100, encoding="utf-8")
+    (workdir / "scripts" / "mission.lua").write_text("local x = MOOSE\n\n  print( x )\n", encoding="utf-8")
+    (workdir / "configs").mkdir()
+    (workdir / "configs" / "bundle.txt").write_text("Moose.lua\nmission.lua\n", encoding="utf-8")
+    minifier = ScriptMinifier(ParseCache(tmp_path / "cache"))
+    build = Build(Config(mission_dir=tmp_path.as_posix()), jobs=1, minifier=minifier)
+    out = tmp_path / "out.miz"
+
+    assert build.build(str(workdir), str(out), release=True, bundle=True) == (0, 4)
+    with zipfile.ZipFile(out) as z:
+        assert "I10n/Default/Moose.lua" not in z.namelist()
+        bundle = z.read("I10n/Default/bundle.lua").decode()
+    assert bundle == ("-- Moose.lua\n(function(...)\n" + "MOOSE={}\n" * 100 + "end)(...);\n"
+                      "-- mission.lua\n(function(...)\nlocal x=MOOSE\nprint(x)\nend)(...);\n")
+    assert minifier.stats.scripts == 2 and minifier.stats.bytes_out < minifier.stats.bytes_in
+
+    # a new order rebuilds the bundle, the minified scripts come from the cache
+    (workdir / "configs" / "bundle.txt").write_text("mission.lua\nMoose.lua\n", encoding="utf-8")
+    assert build.build(str(workdir), str(out), release=True, bundle=True) == (3, 1)
+    assert minifier.stats.cached == 2
+    with zipfile.ZipFile(out) as z:
+        assert z.read("I10n/Default/bundle.lua").startswith(b"-- mission.lua\n")
@@ -0,0 +1,47 @@
+import os
+from pathlib import Path
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.parse_lua import parse_lua_table_file
+
+
+def test_cache_roundtrip(tmp_path: Path):
+    cache = ParseCache(tmp_path / "cache")
+    key = cache.key(b"mission = {}")
+    assert cache.get(key) is None
+    cache.put(key, {"variable": "mission", "data": {}})
+    assert cache.get(key) == {"variable": "mission", "data": {}}
+    assert cache.key(b"mission = {}") == key
+    assert cache.key(b"mission = {1}") != key
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ParseCache(tmp_path / "cache", max_bytes=10**9)
+    keys = [cache.key(bytes([i])) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, "x" * 1000)
+        os.utime(cache._entry(key), (i, i))
+    # touch the oldest entry so the second one becomes least recently used
+    assert cache.get(keys[0]) is not None
+    count, size = cache.usage()
+    assert count == 3
+    cache.max_bytes = size - 1
+    assert cache.evict() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_parse_lua_table_file_uses_cache(tmp_path: Path):
+    src = tmp_path / "options"
+    src.write_text('options = \n{\n\t["a"] = 1,\n} -- end of options\n', encoding="utf-8")
+    cache = ParseCache(tmp_path / "cache")
+    res = parse_lua_table_file(src, cache)
+    assert res == {"variable": "options", "data": {"a": 1}}
+    assert cache.usage()[0] == 1
+    # a hit is served from the cache, a change in content is parsed again
+    cache.put(cache.key(src.read_bytes()), {"variable": "options", "data": {"a": 2}})
+    assert parse_lua_table_file(src, cache)["data"] == {"a": 2}
+    src.write_text('options = \n{\n\t["a"] = 3,\n} -- end of options\n', encoding="utf-8")
+    assert parse_lua_table_file(src, cache)["data"] == {"a": 3}
+    assert cache.clear() == 2
@@ -14,3 +14,43 @@ def test_help():
     assert rc != 0
     assert "usage" in out.lower() or "usage" in err.lower()
 
+
+def test_version():
+    from ssf_mission_tools import __version__
+    rc, out, err = run_module(["--version"])
+    assert rc == 0
+    assert out.strip() == __version__
+
+def test_fast_paths_load_no_commands():
+    # --version and --help must not import command modules or resolve the config
+    code = (
+        "import sys\n"
+        "from ssf_mission_tools.cli import main\n"
+        "main(['--version'])\n"
+        "main(['--help'])\n"
+        "print(sorted(m for m in sys.modules if m.startswith('ssf_mission_tools')))\n"
+    )
+    p = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert p.returncode == 0, p.stderr
+    assert p.stdout.strip().splitlines()[-1] == "['ssf_mission_tools', 'ssf_mission_tools.cli']"
+
+def test_find_command():
+    from ssf_mission_tools.cli import find_command
+    assert find_command(["--timings", "update", "-d", "x"]) == "update"
+    assert find_command(["--profile", "sort", "build"]) == "build"
+    assert find_command(["--version"]) is None
+    assert find_command(["unknown"]) is None
+
+def test_no_daemon_after_command(tmp_path, monkeypatch):
+    from ssf_mission_tools import cli, daemon
+    from ssf_mission_tools.diff import Diff
+
+    def fail(argv):
+        raise AssertionError("sent to the daemon")
+
+    monkeypatch.setattr(daemon, "run_in_daemon", fail)
+    monkeypatch.setattr(Diff, "handle_arguments", classmethod(lambda cls, args, cfg: 7 if args.no_daemon else 8))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    assert cli.main(["diff", "--no-daemon", "a.miz", "b.miz"]) == 7
+    assert cli.main(["--no-daemon", "diff", "a.miz", "b.miz"]) == 7
@@ -0,0 +1,16 @@
+import json
+from pathlib import Path
+
+from ssf_mission_tools.config import Config
+
+
+def test_load_config_does_not_probe_saved_games(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    path = Config()._path
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"mission_dir": "D:/Missions", "dcs_path": "D:/DCS", "cache_max_mb": 64, "jobs": 2,
+                                "unknown": 1}), encoding="utf-8")
+    cfg = Config.load_or_default()
+    assert (cfg.mission_dir, cfg.cache_max_mb, cfg.jobs) == ("D:/Missions", 64, 2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["config"]
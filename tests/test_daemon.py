@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket")
+
+
+def test_cli_runs_commands_in_daemon(tmp_path: Path, write_miz):
+    env = {**os.environ, "XDG_CONFIG_HOME": str(tmp_path / "config"), "XDG_CACHE_HOME": str(tmp_path / "cache"),
+           "XDG_RUNTIME_DIR": str(tmp_path / "run")}
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    write_miz(missions / "test.miz", {"mission": 'mission = \n{\n\t["a"] = 1,\n} -- end of mission\n', "theatre": "Caucasus"})
+    config = tmp_path / "config" / "ssf-mission-tools" / "ssf-mission-tools.config.json"
+    config.parent.mkdir(parents=True)
+    config.write_text(json.dumps({"mission_dir": missions.as_posix(), "jobs": 1}), encoding="utf-8")
+
+    def cli(*argv: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, "-m", "ssf_mission_tools", *argv], cwd=tmp_path, env=env,
+                              capture_output=True, text=True)
+
+    assert cli("init", "-m", "test.miz", "-d", "dev").returncode == 0
+    daemon = subprocess.Popen([sys.executable, "-m", "ssf_mission_tools", "daemon", "start"], cwd=PROJECT_ROOT, env=env,
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        assert "listening" in daemon.stdout.readline()
+        p = cli("update", "-d", "dev")
+        assert p.returncode == 0, p.stdout
+        assert "is up to date with test.miz" in p.stdout
+        assert "1 request(s) served" in cli("daemon", "status").stdout
+        # relative paths are resolved in the directory of the client
+        assert cli("update", "-d", "missing").returncode != 0
+        assert cli("daemon", "stop").returncode == 0
+        daemon.wait(timeout=10)
+    finally:
+        daemon.kill()
+    assert not (tmp_path / "run" / "ssf-mission-tools.sock").exists()
+    # without a daemon the command runs in the CLI process
+    assert "is up to date" in cli("update", "-d", "dev").stdout
@@ -0,0 +1,86 @@
+from argparse import Namespace
+from pathlib import Path
+
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.diff import Diff, diff_tables, join_path, subtree_hashes
+from ssf_mission_tools.parse_lua import decode_lua_table
+
+MISSION = (
+    'mission = \n{\n'
+    '\t["coalition"] = {["blue"] = {["country"] = {[1] = {["name"] = "USA"}, [2] = {["name"] = "UK",'
+    ' ["plane"] = {["group"] = {[1] = {["units"] = {[1] = {["x"] = 1.5, ["y"] = 2}}}}}}}}},\n'
+    '\t["trig"] = {["flag"] = {[1] = true}},\n'
+    '} -- end of mission\n'
+)
+
+
+def test_subtree_hashes_ignore_order_but_not_types():
+    a = decode_lua_table('{["x"] = 1, ["y"] = {["z"] = true}}')
+    b = decode_lua_table('{["y"] = {["z"] = true}, ["x"] = 1}')
+    c = decode_lua_table('{["x"] = 1, ["y"] = {["z"] = 1}}')
+    assert subtree_hashes(a)[id(a)] == subtree_hashes(b)[id(b)]
+    assert subtree_hashes(a)[id(a)] != subtree_hashes(c)[id(c)]
+
+
+def test_diff_tables_values_with_equal_builtin_hashes():
+    # hash(-1) == hash(-2) and hash(1) == hash(2**61)
+    assert [c.format() for c in diff_tables({"x": {"a": -1}}, {"x": {"a": -2}}, "mission")] == ["~ mission: x.a: -1 -> -2"]
+    assert [c.format() for c in diff_tables({"x": {"a": 1}}, {"x": {"a": 2 ** 61}}, "mission")] == [
+        f"~ mission: x.a: 1 -> {2 ** 61}"]
+    assert diff_tables({"x": {"a": 1}}, {"x": {"a": 1.0}})
+
+
+def test_diff_tables_paths():
+    old = decode_lua_table(MISSION[MISSION.index("{"):])
+    new = decode_lua_table(MISSION[MISSION.index("{"):].replace('["x"] = 1.5', '["x"] = 3').replace("[1] = true", '[2] = false'))
+    changes = [c.format() for c in diff_tables(old, new, "mission")]
+    assert changes == [
+        "~ mission: coalition.blue.country[2].plane.group[1].units[1].x: 1.5 -> 3",
+        "- mission: trig.flag[1] = true",
+        "+ mission: trig.flag[2] = false",
+    ]
+    assert join_path("a", "odd key") == 'a["odd key"]'
+
+
+def test_diff_command(tmp_path: Path, capsys, write_miz):
+    cfg = Config(mission_dir=tmp_path.as_posix())
+    old = write_miz(tmp_path / "old.miz", {"mission": MISSION, "theatre": "Caucasus"})
+    new = write_miz(tmp_path / "new.miz", {"mission": MISSION.replace('"UK"', '"France"'), "theatre": "Caucasus",
+                                           "kneeboard/IMAGES/a.png": b"\x89PNG"})
+    args = Namespace(old=str(old), new=str(new), member=None, no_cache=True)
+    assert Diff.handle_arguments(args, cfg) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "+ kneeboard/IMAGES/a.png",
+        '~ mission: coalition.blue.country[2].name: "UK" -> "France"',
+    ]
+
+    # a development directory holds the same mission, sorted
+    workdir = tmp_path / "dev"
+    (workdir / "mission").mkdir(parents=True)
+    (workdir / "mission" / "mission").write_text(MISSION, encoding="utf-8")
+    (workdir / "mission" / "theatre").write_text("Caucasus", encoding="utf-8")
+    args = Namespace(old=str(old), new=str(workdir), member=None, no_cache=True)
+    assert Diff.handle_arguments(args, cfg) == 0
+    assert capsys.readouterr().out == ""
+
+    args = Namespace(old=str(tmp_path / "missing.miz"), new=str(workdir), member=None, no_cache=True)
+    assert Diff.handle_arguments(args, cfg) == -1
+
+    # a directory without mission/ is not an empty mission
+    (tmp_path / "empty").mkdir()
+    capsys.readouterr()
+    args = Namespace(old=str(old), new=str(tmp_path / "empty"), member=None, no_cache=True)
+    assert Diff.handle_arguments(args, cfg) == -1
+    assert "is not a development directory" in capsys.readouterr().out
+
+
+def test_diff_upper_case_kneeboard(tmp_path: Path, capsys, write_miz):
+    cfg = Config(mission_dir=tmp_path.as_posix())
+    miz = write_miz(tmp_path / "a.miz", {"mission": MISSION, "KNEEBOARD/IMAGES/a.png": b"\x89PNG"})
+    workdir = tmp_path / "dev"
+    (workdir / "mission" / "KNEEBOARD" / "IMAGES").mkdir(parents=True)
+    (workdir / "mission" / "mission").write_text(MISSION, encoding="utf-8")
+    (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "a.png").write_bytes(b"\x89PNG")
+    args = Namespace(old=str(miz), new=str(workdir), member=None, no_cache=True)
+    assert Diff.handle_arguments(args, cfg) == 0
+    assert capsys.readouterr().out == ""
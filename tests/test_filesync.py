@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+from ssf_mission_tools.common import copy_resources
+from ssf_mission_tools.filesync import copy_file, sync_tree
+
+
+def test_copy_file_keeps_content_and_mtime(tmp_path: Path):
+    src = tmp_path / "a.jpg"
+    src.write_bytes(os.urandom(3 * 1024 * 1024 + 7))
+    os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+    dst = tmp_path / "out" / "a.jpg"
+    assert copy_file(str(src), str(dst)) in ("reflink", "copy_file_range", "copy")
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+    assert os.listdir(dst.parent) == ["a.jpg"]
+
+
+def test_sync_tree_only_touches_changed_files(tmp_path: Path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.ogg").write_bytes(b"a" * 100)
+    (src / "sub" / "b.jpg").write_bytes(b"b" * 100)
+    stats = sync_tree(str(src), str(dst))
+    assert stats.copied == ["a.ogg", "sub/b.jpg"] and stats.unchanged == 0
+
+    assert sync_tree(str(src), str(dst)).unchanged == 2
+
+    # extracted again: same content with a new mtime only refreshes the timestamp
+    os.utime(src / "a.ogg", ns=(2_000_000_000, 2_000_000_000))
+    (src / "sub" / "b.jpg").write_bytes(b"c" * 100)
+    stats = sync_tree(str(src), str(dst))
+    assert stats.copied == ["sub/b.jpg"] and stats.unchanged == 1
+    assert (dst / "a.ogg").stat().st_mtime_ns == 2_000_000_000
+    assert (dst / "sub" / "b.jpg").read_bytes() == b"c" * 100
+
+    # files removed from the source are deleted, with their empty directories
+    (src / "sub" / "b.jpg").unlink()
+    assert sync_tree(str(src), str(dst)).removed == ["sub/b.jpg"]
+    assert not (dst / "sub").exists()
+
+
+def test_copy_resources_skips_sorted_members(tmp_path: Path):
+    build = tmp_path / "build" / "I10n" / "Default"
+    build.mkdir(parents=True)
+    (build / "dictionary").write_text("unsorted")
+    (build / "sound.ogg").write_bytes(b"ogg")
+    mission = tmp_path / "mission" / "I10n" / "Default"
+    mission.mkdir(parents=True)
+    (mission / "dictionary").write_text("sorted")
+    (mission / "old.ogg").write_bytes(b"old")
+    stats = copy_resources(str(tmp_path))
+    assert stats.copied == ["Default/sound.ogg"] and stats.removed == ["Default/old.ogg"]
+    assert (mission / "dictionary").read_text() == "sorted"
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.init import Init
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_sort_and_copy_special_files_reports_errors_per_file(tmp_path: Path, jobs: int):
+    build = tmp_path / "build"
+    (build / "I10n" / "Default").mkdir(parents=True)
+    (build / "mission").write_text('mission = \n{\n\t["b"] = 2,\n\t["a"] = 1,\n} -- end of mission\n', encoding="utf-8")
+    (build / "options").write_text('options = \n{\n\t["a"] = {\n', encoding="utf-8")
+    (build / "I10n" / "Default" / "dictionary").write_text('dictionary = \n{\n} -- end of dictionary\n', encoding="utf-8")
+
+    init = Init(Config(mission_dir=tmp_path.as_posix()), jobs=jobs)
+    errors = init.sort_and_copy_special_files(str(tmp_path))
+
+    assert list(errors) == ["options"]
+    assert isinstance(errors["options"], ValueError)
+    assert (tmp_path / "mission" / "mission").read_text(encoding="utf-8") == (
+        'mission = \n{\n\t["a"] = 1,\n\t["b"] = 2,\n} -- end of mission\n'
+    )
+    assert (tmp_path / "mission" / "I10n" / "Default" / "dictionary").exists()
+    assert not (tmp_path / "mission" / "options").exists()
+
+
+def test_sync_from_archive_prevents_zip_slip(tmp_path: Path):
+    import zipfile
+    with zipfile.ZipFile(tmp_path / "evil.miz", "w") as z:
+        z.writestr("I10n/../../evil.txt", "bad")
+    init = Init(Config(mission_dir=tmp_path.as_posix()))
+    with pytest.raises(ValueError):
+        init.sync_from_archive("evil.miz", str(tmp_path / "dev"))
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_unpack_extracts_upper_case_kneeboard(tmp_path: Path, write_miz):
+    from ssf_mission_tools.common import copy_kneeboard
+    write_miz(tmp_path / "a.miz", {"mission": "mission = \n{\n} -- end of mission\n", "KNEEBOARD/IMAGES/a.png": "png",
+                                   "track_data/1": "skipped"})
+    init = Init(Config(mission_dir=tmp_path.as_posix()))
+    workdir = tmp_path / "dev"
+    init.create_directory_structure(str(workdir))
+    init.unpack_mission_files("a.miz", str(workdir))
+    copy_kneeboard(str(workdir))
+    assert (workdir / "build" / "KNEEBOARD" / "IMAGES" / "a.png").exists()
+    assert not (workdir / "build" / "track_data").exists()
+    assert (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "a.png").read_text() == "png"
+    assert (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "place_images_here").exists()
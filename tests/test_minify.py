@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.minify import ScriptMinifier, bundle_lua, minify_lua
+
+
+def test_minify_lua_strips_comments_and_whitespace():
+    source = b"""--- doc comment
+--[==[ long
+comment ]==]
+local s = "a -- not a comment"  ..  'it\\'s'   -- trailing
+local t = [[ keep
+  this ]]
+if x == - -1 then
+    print( x .. 1, 1 .. x, a[ [[k]] ], - y )--[[c]]return
+end
+local y = x--[[c]]+2
+"""
+    assert minify_lua(source) == b"""local s="a -- not a comment"..'it\\'s'
+local t=[[ keep
+  this ]]
+if x==- -1 then
+print(x.. 1,1 ..x,a[ [[k]]],-y)return
+end
+local y=x+2
+"""
+    assert minify_lua(b"-- only a comment\n") == b""
+
+
+def test_script_minifier_caches_by_content(tmp_path: Path):
+    minifier = ScriptMinifier(ParseCache(tmp_path))
+    source = b"local a = 1 -- one\n" * 10
+    assert minifier.minify(source) == b"local a=1\n" * 10
+    assert minifier.minify(source) == b"local a=1\n" * 10
+    assert (minifier.stats.scripts, minifier.stats.cached) == (2, 1)
+    assert "2 script(s), 1 from cache" in minifier.stats.summary()
+
+
+def test_bundle_lua_scopes_top_level_return():
+    # an early return must only end its own script, not the rest of the bundle
+    bundle = bundle_lua([("a.lua", b"if not ctld then return end\nctld.setup()"), ("b.lua", b"print(1)\n")])
+    assert bundle == (b"-- a.lua\n(function(...)\nif not ctld then return end\nctld.setup()\nend)(...);\n"
+                      b"-- b.lua\n(function(...)\nprint(1)\nend)(...);\n")
@@ -1,6 +1,10 @@
 from pathlib import Path
 
-from ssf_mission_tools.parse_lua import parse_lua_table_file
+import pytest
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.parse_lua import (LazyTable, LuaArray, TableIndex, decode_lua_table, index_lua_table, parse_lua_table_file,
+                                         sort_and_write, sort_table)
 
 
 def test_parse_mission_01():
@@ -13,3 +17,150 @@ def test_parse_mission_01():
     assert "trig" in data
     assert "date" in data
     assert data["date"]["Year"] == 1999
+
+
+def test_parse_matches_slpp():
+    slpp = pytest.importorskip("slpp")
+    p = Path(__file__).resolve().parents[1] / "tests" / "test_data" / "mission_01"
+    txt = p.read_text(encoding="utf-8", errors="ignore")
+    expected = slpp.slpp.decode(txt[txt.index("{"):])
+    assert parse_lua_table_file(p)["data"] == expected
+
+
+def test_decode_lua_table_dialect():
+    txt = (
+        '{\n'
+        '\t["name"] = "say \\"hi\\"",\n'
+        '\t[1] = -1.5,\n'
+        '\t["flags"] = {true, false, nil},\n'
+        '\t["hex"] = 0x10,\n'
+        '\t["sub"] = \n'
+        '\t{\n'
+        '\t\t["x"] = 3e+2,\n'
+        '\t}, -- end of ["sub"]\n'
+        '} -- end of table\n'
+    )
+    assert decode_lua_table(txt) == {
+        "name": 'say "hi"',
+        1: -1.5,
+        "flags": [True, False, None],
+        "hex": 16,
+        "sub": {"x": 300.0},
+    }
+
+
+def test_decode_lua_table_unterminated():
+    with pytest.raises(ValueError):
+        decode_lua_table('{["a"] = {')
+
+
+def test_sort_and_write_dcs_layout(tmp_path: Path):
+    p = Path(__file__).resolve().parents[1] / "tests" / "test_data" / "mission_01"
+    res = parse_lua_table_file(p)
+    out = tmp_path / "mission"
+    sort_and_write(res["variable"], res["data"], out)
+    # same lines as the file DCS saved, only reordered
+    written = out.read_text(encoding="utf-8")
+    original = p.read_text(encoding="utf-8")
+    assert sorted(written.splitlines()) == sorted(original.splitlines())
+    assert parse_lua_table_file(out) == res
+
+
+def test_sort_and_write_natural_order(tmp_path: Path):
+    out = tmp_path / "options"
+    sort_and_write("options", {"b": {10: "x", 2: "y"}, "a": {}, "C": True}, out)
+    assert out.read_text(encoding="utf-8") == (
+        'options = \n'
+        '{\n'
+        '\t["a"] = {},\n'
+        '\t["b"] = \n'
+        '\t{\n'
+        '\t\t[2] = "y",\n'
+        '\t\t[10] = "x",\n'
+        '\t}, -- end of ["b"]\n'
+        '\t["C"] = true,\n'
+        '} -- end of options\n'
+    )
+
+
+def test_decode_compact_tables():
+    data = decode_lua_table('{["units"] = {[2] = "b", [1] = "a"}, ["gaps"] = {[1] = 1, [3] = 3}, ["key"] = 1}')
+    units = data["units"]
+    assert isinstance(units, LuaArray)
+    assert units == {1: "a", 2: "b"} and list(units.items()) == [(1, "a"), (2, "b")]
+    assert 0 not in units and 3 not in units
+    assert type(data["gaps"]) is dict
+    # keys are interned, so repeated keys share one string object
+    other = decode_lua_table('{["key"] = 2}')
+    assert next(iter(data.keys() - {"units", "gaps"})) is next(iter(other))
+
+
+def test_lua_array_assignment():
+    array = LuaArray(["a"])
+    array[1] = "b"
+    array[2] = "c"
+    assert array == LuaArray(["b", "c"])
+    with pytest.raises(KeyError):
+        array[4] = "d"
+    with pytest.raises(KeyError):
+        array["1"] = "d"
+
+
+def test_sort_table_in_place():
+    inner = {"y": 2, "x": 1}
+    data = {"b": LuaArray([inner]), "a10": 1, "a2": [True]}
+    assert sort_table(data) is data
+    assert list(data) == ["a2", "a10", "b"]
+    assert data["b"][1] is inner and list(inner) == ["x", "y"]
+
+
+def test_parse_lazy_mission_01(tmp_path: Path):
+    p = Path(__file__).resolve().parents[1] / "tests" / "test_data" / "mission_01"
+    full = parse_lua_table_file(p)["data"]
+    for cache in (None, ParseCache(tmp_path, max_bytes=1 << 30)):
+        res = parse_lua_table_file(p, cache, lazy=True)
+        data = res["data"]
+        assert res["variable"] == "mission" and isinstance(data, LazyTable)
+        assert data["date"]["Year"] == 1999
+        assert list(data) == list(full)
+        assert data["coalition"]["blue"] == full["coalition"]["blue"]
+        assert data.load() == full
+    # the index was stored in the cache and is used on the next load
+    assert ParseCache(tmp_path).usage()[0] == 1
+    assert parse_lua_table_file(p, ParseCache(tmp_path), lazy=True)["data"]["trig"] == full["trig"]
+
+
+def test_index_lua_table_any_layout():
+    # without `-- end of` trailers, with braces in strings
+    txt = '{["a"] = {["b"] = {["c"] = "}", [1] = {[[{]]}}, ["d"] = 1}, [5] = true}'
+    index = index_lua_table(txt)
+    assert index.entries[5] is True
+    assert index.entries["a"].entries["b"].entries["c"] == "}"
+    assert index.entries["a"].entries["b"].entries[1] == TableIndex(txt.index("{[["))
+    data = LazyTable(txt, index)
+    assert data["a"]["b"][1] == ["{"]
+    assert data.load() == decode_lua_table(txt)
+
+
+def test_index_lua_table_trailer_in_string():
+    # a line break in a string is escaped, so the trailer line in it is skipped
+    txt = (
+        '{\n'
+        '\t["s"] = \n'
+        '\t{\n'
+        '\t\t["t"] = \n'
+        '\t\t{\n'
+        '\t\t\t[1] = \n'
+        '\t\t\t{\n'
+        '\t\t\t\t[1] = "{x\\\n'
+        '\t\t\t}, -- end of [1]\n'
+        '",\n'
+        '\t\t\t}, -- end of [1]\n'
+        '\t\t\t[2] = 1,\n'
+        '\t\t}, -- end of ["t"]\n'
+        '\t}, -- end of ["s"]\n'
+        '}\n'
+    )
+    data = LazyTable(txt, index_lua_table(txt))
+    assert data["s"]["t"][2] == 1
+    assert data["s"]["t"][1] == decode_lua_table(txt)["s"]["t"][1]
@@ -0,0 +1,94 @@
+import json
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+from ssf_mission_tools.cache import ParseCache
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.query import MissionIndex, Query
+
+MISSION = (
+    'mission = \n{\n'
+    '\t["coalition"] = {\n'
+    '\t\t["blue"] = {["country"] = {[1] = {["name"] = "USA", ["plane"] = {["group"] = {\n'
+    '\t\t\t[1] = {["groupId"] = 1, ["name"] = "Viper", ["units"] = {\n'
+    '\t\t\t\t[1] = {["unitId"] = 11, ["name"] = "Viper-1", ["type"] = "F-16C_50", ["x"] = 1, ["y"] = 2},\n'
+    '\t\t\t\t[2] = {["unitId"] = 12, ["name"] = "Viper-2", ["type"] = "F-16C_50", ["x"] = 3, ["y"] = 4}}},\n'
+    '\t\t\t[2] = {["groupId"] = 2, ["name"] = "Hornet", ["units"] = {\n'
+    '\t\t\t\t[1] = {["unitId"] = 21, ["name"] = "Hornet-1", ["type"] = "FA-18C_hornet"}}}}}}}},\n'
+    '\t\t["red"] = {["country"] = {[1] = {["name"] = "Russia", ["vehicle"] = {["group"] = {\n'
+    '\t\t\t[1] = {["groupId"] = 3, ["name"] = "Armor", ["units"] = {\n'
+    '\t\t\t\t[1] = {["unitId"] = 31, ["name"] = "Armor-1", ["type"] = "T-72B3"}}}}}}}},\n'
+    '\t},\n'
+    '\t["trigrules"] = {\n'
+    '\t\t[1] = {["comment"] = "Briefing", ["predicate"] = "triggerOnce",\n'
+    '\t\t\t["actions"] = {[1] = {["predicate"] = "a_out_text_delay", ["text"] = "DictKey_57"}}},\n'
+    '\t\t[2] = {["comment"] = "Load script", ["predicate"] = "triggerStart",\n'
+    '\t\t\t["actions"] = {[1] = {["predicate"] = "a_do_script_file", ["file"] = "ResKey_Action_3"}}},\n'
+    '\t},\n'
+    '\t["trig"] = {["actions"] = {[1] = "a_out_text_delay(getValueDictByKey(\\"DictKey_57\\"), 10);"}},\n'
+    '\t["descriptionText"] = "DictKey_descriptionText_1",\n'
+    '} -- end of mission\n'
+)
+DICTIONARY = 'dictionary = \n{\n\t["DictKey_57"] = "Welcome",\n\t["DictKey_descriptionText_1"] = "",\n} -- end of dictionary\n'
+MAP_RESOURCE = 'mapResource = \n{\n\t["ResKey_Action_3"] = "init.lua",\n} -- end of mapResource\n'
+
+
+def members(mission: str = MISSION) -> dict:
+    return {"mission": mission, "I10n/Default/dictionary": DICTIONARY, "I10n/Default/mapResource": MAP_RESOURCE,
+            "theatre": "Caucasus"}
+
+
+def test_mission_index_lookups(tmp_path: Path, write_miz):
+    cfg = Config(mission_dir=tmp_path.as_posix())
+    index = MissionIndex.load(str(write_miz(tmp_path / "a.miz", members())), cfg)
+    vipers = index.query("units", type="F-16C_50", coalition="blue")
+    assert [u["unitId"] for u in vipers] == [11, 12]
+    assert vipers[0] == {"unitId": 11, "name": "Viper-1", "type": "F-16C_50", "coalition": "blue", "country": "USA",
+                         "category": "plane", "groupId": 1, "group": "Viper", "x": 1, "y": 2}
+    assert index.query("units", type="F-16C_50", coalition="red") == []
+    assert [g["name"] for g in index.query("groups", unit_id=31)] == ["Armor"]
+    assert [g["name"] for g in index.query("groups", type="FA-18C_hornet")] == ["Hornet"]
+    assert [u["name"] for u in index.query("units", group_id=1, name="Viper-2")] == ["Viper-2"]
+    assert len(index.query("units")) == 4
+    assert [t["comment"] for t in index.query("triggers", key="DictKey_57")] == ["Briefing"]
+    assert index.query("keys", key="DictKey_57") == [
+        {"key": "DictKey_57", "text": "Welcome", "file": None, "references": ["trig.actions[1]", "trigrules[1].actions[1].text"]}]
+    assert index.query("keys", key="ResKey_Action_3")[0]["file"] == "init.lua"
+
+
+def test_mission_index_is_cached_by_content(tmp_path: Path, monkeypatch, write_miz):
+    cfg = Config(mission_dir=tmp_path.as_posix())
+    cache = ParseCache(tmp_path / "cache")
+    miz = write_miz(tmp_path / "a.miz", members())
+    MissionIndex.load(str(miz), cfg, cache)
+    build = MissionIndex.build
+
+    def fail(tables):
+        raise AssertionError("index rebuilt")
+
+    monkeypatch.setattr(MissionIndex, "build", fail)
+    assert len(MissionIndex.load(str(miz), cfg, ParseCache(tmp_path / "cache")).query("units")) == 4
+    # a changed mission is indexed again
+    write_miz(miz, members(MISSION.replace('"T-72B3"', '"T-90"')))
+    with pytest.raises(AssertionError):
+        MissionIndex.load(str(miz), cfg, cache)
+    monkeypatch.setattr(MissionIndex, "build", build)
+    assert MissionIndex.load(str(miz), cfg, cache).query("units", type="T-90")
+
+
+def test_query_command(tmp_path: Path, capsys, write_miz):
+    cfg = Config(mission_dir=tmp_path.as_posix())
+    miz = write_miz(tmp_path / "a.miz", members())
+    options = dict(id=None, name=None, type=None, coalition=None, country=None, category=None,
+                   group_id=None, unit_id=None, key=None, no_cache=True)
+    args = Namespace(kind="groups", source=str(miz), **{**options, "coalition": "blue", "category": "plane"})
+    assert Query.handle_arguments(args, cfg) == 0
+    assert [g["groupId"] for g in json.loads(capsys.readouterr().out)] == [1, 2]
+    args = Namespace(kind="units", source=str(miz), **{**options, "type": "Su-27"})
+    assert Query.handle_arguments(args, cfg) == 1
+    assert json.loads(capsys.readouterr().out) == []
+    args = Namespace(kind="keys", source=str(miz), **{**options, "unit_id": 11})
+    assert Query.handle_arguments(args, cfg) == -1
+    assert "does not apply" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+import io
+import zipfile
+from argparse import Namespace
+from pathlib import Path
+
+from ssf_mission_tools.build import Build
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.parse_lua import parse_lua_table_file, write_lua_table
+from ssf_mission_tools.shards import assemble_shards, write_shards
+from ssf_mission_tools.update import Update
+
+MISSION_01 = Path(__file__).resolve().parents[1] / "tests" / "test_data" / "mission_01"
+
+
+def test_shards_reassemble_to_sorted_mission(tmp_path: Path):
+    res = parse_lua_table_file(MISSION_01)
+    shards = tmp_path / "mission.shards"
+    written, unchanged = write_shards(res["variable"], res["data"], str(shards))
+    assert written > 1 and unchanged == 0
+    assert (shards / "coalition" / "blue" / "country" / "1" / "plane" / "group" / "1.lua").exists()
+    expected = io.StringIO()
+    write_lua_table(expected, res["variable"], res["data"])
+    assert assemble_shards(str(shards)) == expected.getvalue()
+
+    # only the shard holding the change is written again
+    assert write_shards(res["variable"], res["data"], str(shards)) == (0, written)
+    res["data"]["coalition"]["blue"]["country"][1]["plane"]["group"][1]["x"] = 1.0
+    assert write_shards(res["variable"], res["data"], str(shards)) == (1, written - 1)
+
+    # shards of removed tables are deleted
+    del res["data"]["coalition"]["blue"]["country"][1]["plane"]
+    write_shards(res["variable"], res["data"], str(shards))
+    assert not (shards / "coalition" / "blue" / "country" / "1" / "plane").exists()
+    assert "country/1/plane/" not in (shards / "root.lua").read_text(encoding="utf-8")
+
+
+def test_update_and_build_sharded(tmp_path: Path, write_miz):
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    mission = MISSION_01.read_text(encoding="utf-8")
+    write_miz(missions / "test.miz", {"mission": mission, "theatre": "Caucasus"})
+    cfg = Config(mission_dir=missions.as_posix())
+    workdir = tmp_path / "dev"
+    args = Namespace(directory=str(workdir), mission="test.miz", full=False, no_cache=True, jobs=1, in_memory=True,
+                     shard=True, watch=False)
+    assert Update.handle_arguments(args, cfg) == 0
+    assert (workdir / "mission" / "mission.shards" / "root.lua").exists()
+    assert not (workdir / "mission" / "mission").exists()
+
+    output = workdir / "build" / "test.miz"
+    Build(cfg, 1).build(str(workdir), str(output))
+    with zipfile.ZipFile(output) as z:
+        assert sorted(z.namelist()) == ["mission", "theatre"]
+        packed = z.read("mission").decode("utf-8")
+    assert sorted(packed.splitlines()) == sorted(mission.splitlines())
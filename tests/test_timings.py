@@ -0,0 +1,38 @@
+import pstats
+from pathlib import Path
+
+from ssf_mission_tools.timings import Timings
+
+
+def test_nested_phases_are_reported_in_start_order(tmp_path: Path):
+    import tracemalloc
+    timings = Timings()
+    timings.configure(enabled=True, trace_memory=True, profile_phase="sort/mission",
+                      profile_output=str(tmp_path / "mission.prof"))
+    try:
+        with timings.phase("unpack"):
+            pass
+        with timings.phase("sort"):
+            with timings.phase("mission"):
+                data = [bytearray(1024) for _ in range(1024)]
+                del data
+            timings.record("options", 0.5, 0.25, 42)
+    finally:
+        timings.close()
+    assert not tracemalloc.is_tracing()
+
+    names = [p["name"] for p in timings.to_json()["phases"]]
+    assert names == ["unpack", "sort", "sort/mission", "sort/options"]
+    sort, mission = timings.phases[1], timings.phases[2]
+    assert sort.wall >= mission.wall
+    assert mission.peak_traced >= 1024 * 1024
+    assert sort.peak_traced >= mission.peak_traced
+    assert "sort/options" in timings.format_table()
+    assert pstats.Stats(str(tmp_path / "mission.prof")).total_calls > 0
+
+
+def test_disabled_timings_record_nothing():
+    timings = Timings()
+    with timings.phase("sort"):
+        timings.record("mission", 1.0, 1.0)
+    assert timings.phases == []
@@ -0,0 +1,110 @@
+import zipfile
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.manifest import SyncManifest
+from ssf_mission_tools.update import Update
+
+
+def run_update(cfg: Config, workdir: Path, mission=None, in_memory=False, shard=False) -> int:
+    args = Namespace(directory=str(workdir), mission=mission, full=False, no_cache=True, jobs=1, in_memory=in_memory,
+                     shard=shard, watch=False)
+    return Update.handle_arguments(args, cfg)
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_update_syncs_only_changed_members(tmp_path: Path, in_memory: bool, write_miz):
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    workdir = tmp_path / "dev"
+    cfg = Config(mission_dir=missions.as_posix())
+    members = {
+        "mission": 'mission = \n{\n\t["b"] = 2,\n\t["a"] = 1,\n} -- end of mission\n',
+        "options": 'options = \n{\n\t["x"] = true,\n} -- end of options\n',
+        "theatre": "Caucasus",
+        "I10n/Default/dictionary": 'dictionary = \n{\n\t["DictKey_2"] = "b",\n} -- end of dictionary\n',
+        "kneeboard/IMAGES/a.png": b"\x89PNG",
+    }
+    write_miz(missions / "test.miz", members)
+
+    # first update without a manifest syncs everything
+    assert run_update(cfg, workdir, "test.miz", in_memory) == 0
+    assert (workdir / "build").exists() != in_memory
+    assert (workdir / "mission" / "mission").read_text(encoding="utf-8").index('["a"]') < \
+        (workdir / "mission" / "mission").read_text(encoding="utf-8").index('["b"]')
+    assert (workdir / "mission" / "theatre").read_text() == "Caucasus"
+    assert (workdir / "mission" / "kneeboard" / "IMAGES" / "a.png").exists()
+    manifest = SyncManifest.load(workdir)
+    assert manifest.mission == "test.miz"
+    assert set(manifest.members) == set(members)
+
+    # unchanged members are left alone on the next update
+    (workdir / "mission" / "options").write_text("untouched", encoding="utf-8")
+    members["mission"] = 'mission = \n{\n\t["a"] = 3,\n} -- end of mission\n'
+    del members["kneeboard/IMAGES/a.png"]
+    write_miz(missions / "test.miz", members)
+    assert run_update(cfg, workdir, in_memory=in_memory) == 0
+    assert '["a"] = 3' in (workdir / "mission" / "mission").read_text(encoding="utf-8")
+    assert (workdir / "mission" / "options").read_text(encoding="utf-8") == "untouched"
+    assert not (workdir / "mission" / "kneeboard" / "IMAGES" / "a.png").exists()
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_update_syncs_upper_case_kneeboard(tmp_path: Path, in_memory: bool, write_miz):
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    workdir = tmp_path / "dev"
+    cfg = Config(mission_dir=missions.as_posix())
+    members = {"mission": 'mission = \n{\n} -- end of mission\n', "KNEEBOARD/IMAGES/a.png": b"\x89PNG"}
+    write_miz(missions / "test.miz", members)
+    assert run_update(cfg, workdir, "test.miz", in_memory) == 0
+    assert (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "a.png").read_bytes() == b"\x89PNG"
+
+    del members["KNEEBOARD/IMAGES/a.png"]
+    write_miz(missions / "test.miz", members)
+    assert run_update(cfg, workdir, in_memory=in_memory) == 0
+    assert not (workdir / "mission" / "KNEEBOARD" / "IMAGES" / "a.png").exists()
+
+
+def test_update_requires_mission(tmp_path: Path):
+    cfg = Config(mission_dir=tmp_path.as_posix())
+    assert run_update(cfg, tmp_path / "dev") == -1
+
+
+def test_update_copies_changed_member_with_same_size_and_time(tmp_path: Path):
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    workdir = tmp_path / "dev"
+    cfg = Config(mission_dir=missions.as_posix())
+    image = workdir / "mission" / "kneeboard" / "IMAGES" / "a.png"
+    for content in (b"AAAA", b"BBBB"):
+        with zipfile.ZipFile(missions / "test.miz", "w") as z:
+            z.writestr("theatre", "Caucasus")
+            # many writers store a fixed time
+            z.writestr(zipfile.ZipInfo("kneeboard/IMAGES/a.png", date_time=(2020, 1, 1, 0, 0, 0)), content)
+        assert run_update(cfg, workdir, "test.miz") == 0
+        assert image.read_bytes() == content
+
+
+def test_update_full_removes_members_gone_from_archive(tmp_path: Path, write_miz):
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    workdir = tmp_path / "dev"
+    cfg = Config(mission_dir=missions.as_posix())
+    write_miz(missions / "test.miz", {"theatre": "Caucasus", "kneeboard/IMAGES/a.png": b"\x89PNG"})
+    assert run_update(cfg, workdir, "test.miz") == 0
+    image = workdir / "mission" / "kneeboard" / "IMAGES" / "a.png"
+    assert image.exists()
+    write_miz(missions / "test.miz", {"theatre": "Caucasus"})
+    args = Namespace(directory=str(workdir), mission=None, full=True, no_cache=True, jobs=1, in_memory=False,
+                     shard=False, watch=False)
+    assert Update.handle_arguments(args, cfg) == 0
+    assert not image.exists()
+    # switching to another mission removes what it does not have
+    write_miz(missions / "other.miz", {"kneeboard/IMAGES/b.png": b"\x89PNG"})
+    assert run_update(cfg, workdir, "other.miz") == 0
+    assert not (workdir / "mission" / "theatre").exists()
+    assert (workdir / "mission" / "kneeboard" / "IMAGES" / "b.png").exists()
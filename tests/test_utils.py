@@ -2,7 +2,7 @@ import tempfile
 import zipfile
 from pathlib import Path
 
-from ssf_mission_tools.utils import unzip
+from ssf_mission_tools.utils import member_parts, unzip
 
 
 def test_unzip_basic(tmp_path: Path):
@@ -32,3 +32,30 @@ def test_unzip_prevents_zip_slip(tmp_path: Path):
     except ValueError:
         # expected
         pass
+
+
+def test_unzip_selects_members_and_extracts_large_ones_in_parallel(tmp_path: Path):
+    zpath = tmp_path / "test.miz"
+    large = bytes(range(256)) * 4096
+    with zipfile.ZipFile(zpath, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("mission", "mission = {}")
+        z.writestr("options", "options = {}")
+        z.writestr("track_data/1", "skip")
+        for i in range(4):
+            z.writestr(f"kneeboard/IMAGES/{i}.png", large)
+
+    dest = tmp_path / "out"
+    extracted = unzip(zpath, dest, include=["mission", "kneeboard/*"], exclude=["*/3.png"], jobs=2)
+    assert extracted == ["mission"] + [f"kneeboard/IMAGES/{i}.png" for i in range(3)]
+    assert (dest / "kneeboard" / "IMAGES" / "2.png").read_bytes() == large
+    assert not (dest / "options").exists() and not (dest / "kneeboard" / "IMAGES" / "3.png").exists()
+
+
+def test_member_parts_rejects_unsafe_names():
+    assert member_parts("I10n/Default/./a.ogg") == ("I10n", "Default", "a.ogg")
+    for name in ("../a", "a/../../b", "/etc/passwd", "\\\\server\\share", "C:/a", "a\\..\\..\\b", ""):
+        try:
+            member_parts(name)
+            assert False, f"{name} should have been rejected"
+        except ValueError:
+            pass
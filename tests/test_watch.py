@@ -0,0 +1,54 @@
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from ssf_mission_tools.config import Config
+from ssf_mission_tools.update import Update
+from ssf_mission_tools.watch import StatPoller, open_watcher, wait_until_settled
+
+
+def test_wait_until_settled_waits_for_complete_archive(tmp_path: Path, write_miz):
+    miz = tmp_path / "test.miz"
+    miz.write_bytes(b"PK\x03\x04 partial")
+    watcher = StatPoller(str(miz), interval=0.01)
+
+    def finish() -> None:
+        time.sleep(0.1)
+        write_miz(miz, {"mission": "mission = {}", "theatre": "Caucasus"})
+
+    threading.Thread(target=finish).start()
+    assert wait_until_settled(str(miz), watcher, debounce=0.05) is not None
+    assert zipfile.is_zipfile(miz)
+
+
+@pytest.mark.parametrize("poll", [False, True])
+def test_update_watch_syncs_saves(tmp_path: Path, poll: bool, monkeypatch, write_miz):
+    if poll:
+        monkeypatch.setattr("ssf_mission_tools.watch.open_watcher", lambda path, interval: StatPoller(path, interval))
+    elif isinstance(open_watcher(str(tmp_path / "x")), StatPoller):
+        pytest.skip("inotify not available")
+    missions = tmp_path / "missions"
+    missions.mkdir()
+    miz = missions / "test.miz"
+    write_miz(miz, {"mission": 'mission = \n{\n\t["a"] = 1,\n} -- end of mission\n', "theatre": "Caucasus"})
+    workdir = tmp_path / "dev"
+    update = Update(Config(mission_dir=missions.as_posix()), None, 1)
+    assert update.sync("test.miz", str(workdir)) == 0
+
+    stop = threading.Event()
+    watcher = threading.Thread(target=update.watch, args=("test.miz", str(workdir)), kwargs={"should_stop": stop.is_set})
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        write_miz(miz, {"mission": 'mission = \n{\n\t["a"] = 2,\n} -- end of mission\n', "theatre": "Caucasus"})
+        deadline = time.monotonic() + 5
+        target = workdir / "mission" / "mission"
+        while '["a"] = 2' not in target.read_text(encoding="utf-8"):
+            assert time.monotonic() < deadline, "mission was not synced"
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        watcher.join()